@@ -6,40 +6,224 @@ Processes multiple order numbers against multiple customer numbers
 
 import csv
 import json
+import os
+import queue
+import re
+import threading
 import time
 import logging
+from logging.handlers import MemoryHandler
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from du_order_tracker import DuOrderTracker
 
+# Precompiled patterns for the extract_* helpers
+_DATE_RE = re.compile(r'(\w{3}\s+\d{1,2},\s+\d{4})')  # e.g. "Feb 01, 2025"
+_AMOUNT_RE = re.compile(r'AED\s+([\d,]+\.?\d*)')
+_NON_DIGIT_RE = re.compile(r'\D')
+
+# One scan finds every status keyword (any case) and item name (exact case)
+_KEYWORD_RE = re.compile(r'(?i:delivered|in progress|ready to ship)|Home Wireless|New Sim')
+_STATUS_KEYWORDS = (
+    ("delivered", "Delivered"),
+    ("in progress", "In Progress"),
+    ("ready to ship", "Ready to Ship"),
+)
+_ITEM_KEYWORDS = (
+    ("home wireless", "Home Wireless Plus"),
+    ("new sim", "New Sim"),
+)
+
+def _scan_keywords(text):
+    """Lowercased set of the status keywords and item names found in text"""
+    return {match.group(0).lower() for match in _KEYWORD_RE.finditer(text)}
+
+CSV_FIELDNAMES = [
+    "order_number", "status", "matched_customer", "order_status", 
+    "delivery_date", "total_amount", "items", "attempts", "error", "timestamp"
+]
+
+# Flush the progress CSV to disk every this many orders
+PROGRESS_FLUSH_EVERY = 10
+
+def csv_row(result):
+    """Copy of a result with the items list joined into a string for CSV"""
+    if isinstance(result.get("items"), list):
+        return {**result, "items": ", ".join(result["items"])}
+    return result
+
+def end_with_newline(path):
+    """Terminate a truncated last line, so the next append starts a line of its own"""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    with open(path, 'rb+') as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b'\n':
+            f.write(b'\n')
+
+def _canonicalize(mobile):
+    """
+    Reduce a customer number to a canonical form so format variants compare equal
+    
+    Args:
+        mobile (str): Customer number as entered (e.g. 0561716359 or 971561716359)
+        
+    Returns:
+        str: Digits only, without the 00971/971 country code or 0 trunk prefix
+    """
+    digits = _NON_DIGIT_RE.sub('', mobile)
+    if len(digits) == 14 and digits.startswith('00971'):
+        return digits[5:]
+    if len(digits) == 12 and digits.startswith('971'):
+        return digits[3:]
+    if len(digits) == 10 and digits.startswith('0'):
+        return digits[1:]
+    return digits
+
+def _looks_valid(canonical):
+    """
+    Check whether a canonical customer number could be accepted by the tracking form
+    
+    Args:
+        canonical (str): Customer number from _canonicalize
+        
+    Returns:
+        bool: True for a 9-digit UAE mobile (5XXXXXXXX) or an 8-digit account number
+    """
+    if len(canonical) == 9:
+        return canonical.startswith('5')
+    return len(canonical) == 8
+
+class BrowserPool:
+    def __init__(self, size=4, headless=True, max_uses=50, fast=False):
+        """
+        Initialize a pool of pre-warmed order trackers
+        
+        Args:
+            size (int): Number of browser instances to keep open
+            headless (bool): Run browsers in headless mode
+            max_uses (int): Recycle a browser after this many tracking attempts
+            fast (bool): Re-submit the form already open in each browser instead of reloading it
+        """
+        self.size = size
+        self.headless = headless
+        self.max_uses = max_uses
+        self.fast = fast
+        self.logger = logging.getLogger(__name__)
+        self._idle = queue.Queue()
+        self._uses = {}
+        
+        try:
+            for _ in range(size):
+                self._idle.put(self._spawn())
+        except Exception:
+            # Callers never get a pool to close, so shut the browsers already started here
+            self.close()
+            raise
+    
+    def _spawn(self):
+        """Start a fresh browser instance"""
+        tracker = DuOrderTracker(headless=self.headless)
+        self._uses[tracker] = 0
+        return tracker
+    
+    def _recycle(self, tracker):
+        """Replace a worn-out or broken browser, keeping the old one if a new one can't start"""
+        try:
+            fresh = self._spawn()
+        except Exception as e:
+            self.logger.error(f"Failed to recycle browser: {e}")
+            return tracker
+        
+        self._uses.pop(tracker, None)
+        try:
+            tracker.close()
+        except Exception as e:
+            self.logger.debug(f"Error closing recycled browser: {e}")
+        return fresh
+    
+    def track_order(self, order_number, mobile_number):
+        """
+        Track an order on the next idle browser
+        
+        Args:
+            order_number (str): Order number to track
+            mobile_number (str): Mobile number to track with
+            
+        Returns:
+            dict: Order tracking results
+        """
+        tracker = self._idle.get()
+        try:
+            if self.fast:
+                results = tracker.track_order_fast(order_number, mobile_number)
+            else:
+                results = tracker.track_order(order_number, mobile_number)
+        except Exception:
+            tracker = self._recycle(tracker)
+            raise
+        else:
+            self._uses[tracker] += 1
+            broken = "error" in results and results.get("status") != "no_match"
+            if broken or self._uses[tracker] >= self.max_uses:
+                tracker = self._recycle(tracker)
+            return results
+        finally:
+            self._idle.put(tracker)
+    
+    def close(self):
+        """Close all browsers in the pool"""
+        while True:
+            try:
+                tracker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            tracker.close()
+        self._uses.clear()
+
 class BatchOrderTracker:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, pool_size=4, max_uses=50):
         """
         Initialize the Batch Order Tracker
         
         Args:
             headless (bool): Run browser in headless mode
+            pool_size (int): Number of browsers testing customers concurrently
+            max_uses (int): Recycle each browser after this many attempts
         """
-        self.tracker = None
+        self.pool = None
+        self.executor = None
+        self._progress_file = None
+        self._progress_writer = None
+        self._progress_rows = 0
         self.setup_logging()
-        self.setup_tracker(headless)
+        self.setup_tracker(headless, pool_size, max_uses)
     
     def setup_logging(self):
         """Setup logging configuration"""
+        log_format = '%(asctime)s - %(levelname)s - %(message)s'
+        
+        # Buffer file writes; flushed every 1000 records or on a warning
+        file_handler = logging.FileHandler('batch_tracker.log')
+        file_handler.setFormatter(logging.Formatter(log_format))
+        
         logging.basicConfig(
             level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
+            format=log_format,
             handlers=[
-                logging.FileHandler('batch_tracker.log'),
+                MemoryHandler(1000, flushLevel=logging.WARNING, target=file_handler),
                 logging.StreamHandler()
             ]
         )
         self.logger = logging.getLogger(__name__)
     
-    def setup_tracker(self, headless=True):
-        """Setup the order tracker"""
+    def setup_tracker(self, headless=True, pool_size=4, max_uses=50):
+        """Setup the browser pool and the worker threads that share it"""
         try:
-            self.tracker = DuOrderTracker(headless=headless)
-            self.logger.info("Batch Order Tracker initialized successfully")
+            self.pool = BrowserPool(size=pool_size, headless=headless, max_uses=max_uses)
+            self.executor = ThreadPoolExecutor(max_workers=pool_size)
+            self.logger.info(f"Batch Order Tracker initialized successfully with {pool_size} browsers")
         except Exception as e:
             self.logger.error(f"Failed to initialize tracker: {e}")
             raise
@@ -48,33 +232,62 @@ class BatchOrderTracker:
         """
         Process batch of order numbers against customer numbers
         
+        Each order's result is written to the CSV as soon as it completes, so
+        memory use stays flat no matter how large the batch is.
+        
         Args:
-            order_numbers (list): List of order numbers to test
+            order_numbers (iterable): Order numbers to test
             customer_numbers (list): List of customer numbers to test against
             output_csv (str): Output CSV filename
+            
+        Returns:
+            dict: Summary counters plus the most recent results under "recent"
         """
-        results = []
-        total_orders = len(order_numbers)
-        total_customers = len(customer_numbers)
+        summary = {
+            "processed": 0,
+            "found": 0,
+            "not_found": 0,
+            "attempts": 0,
+            "recent": deque(maxlen=100)
+        }
         
-        self.logger.info(f"Starting batch processing: {total_orders} orders × {total_customers} customers")
+        self.logger.info(f"Starting batch processing against {len(customer_numbers)} customers")
         
-        for i, order_number in enumerate(order_numbers, 1):
-            self.logger.info(f"Processing order {i}/{total_orders}: {order_number}")
-            order_result = self.process_single_order(order_number, customer_numbers)
-            results.append(order_result)
+        try:
+            for order_result in self.iter_results(order_numbers, customer_numbers):
+                self.append_progress(order_result, output_csv)
+                
+                summary["processed"] += 1
+                summary["attempts"] += order_result["attempts"]
+                if order_result["status"] == "found":
+                    summary["found"] += 1
+                elif order_result["status"] == "not_found":
+                    summary["not_found"] += 1
+                summary["recent"].append(order_result)
+        finally:
+            self.close_progress()
+        
+        self.logger.info(f"Batch processing completed. Results saved to {output_csv}")
+        
+        return summary
+    
+    def iter_results(self, order_numbers, customer_numbers):
+        """
+        Yield the result for each order as soon as it has been processed
+        
+        Args:
+            order_numbers (iterable): Order numbers to test
+            customer_numbers (list): List of customer numbers to test against
             
-            # Save progress after each order
-            self.save_progress_csv(results, f"progress_{output_csv}")
+        Yields:
+            dict: Result for each order
+        """
+        for i, order_number in enumerate(order_numbers, 1):
+            self.logger.info(f"Processing order {i}: {order_number}")
+            yield self.process_single_order(order_number, customer_numbers)
             
             # Small delay between orders
             time.sleep(2)
-        
-        # Save final results
-        self.save_final_csv(results, output_csv)
-        self.logger.info(f"Batch processing completed. Results saved to {output_csv}")
-        
-        return results
     
     def process_single_order(self, order_number, customer_numbers):
         """
@@ -100,14 +313,41 @@ class BatchOrderTracker:
             "timestamp": datetime.now().isoformat()
         }
         
+        # Skip malformed and duplicate customers (including one mobile in several formats)
+        candidates = {}
         for customer_number in customer_numbers:
-            order_result["attempts"] += 1
-            
-            try:
-                self.logger.info(f"Testing {order_number} with customer {customer_number}")
+            canonical = _canonicalize(customer_number)
+            if not _looks_valid(canonical):
+                self.logger.debug("Skipping invalid customer number %s", customer_number)
+                continue
+            if canonical in candidates:
+                continue
+            candidates[canonical] = customer_number
+        
+        # Fan the customers out over the browser pool; the first match cancels the rest
+        found = threading.Event()
+        futures = {
+            self.executor.submit(self._probe, order_number, customer_number, found): customer_number
+            for customer_number in candidates.values()
+        }
+        
+        try:
+            for future in as_completed(futures):
+                customer_number = futures[future]
+                
+                try:
+                    results = future.result()
+                except Exception as e:
+                    order_result["attempts"] += 1
+                    self.logger.error("Error testing %s with %s: %s", order_number, customer_number, e)
+                    order_result["error"] = str(e)
+                    continue
                 
-                # Track the order
-                results = self.tracker.track_order(order_number, customer_number)
+                # Skipped because another customer already matched
+                if results is None:
+                    continue
+                
+                order_result["attempts"] += 1
                 
                 # Check if we got valid results (not an error)
                 if "error" not in results and results.get("tracking_info"):
@@ -124,93 +364,95 @@ class BatchOrderTracker:
                             order_result["total_amount"] = self.extract_total_amount(value)
                             order_result["items"] = self.extract_items(value)
                             
-                            self.logger.info(f"✅ MATCH FOUND: {order_number} with customer {customer_number}")
+                            self.logger.info("✅ MATCH FOUND: %s with customer %s", order_number, customer_number)
                             return order_result
                 
                 # If no match found, continue to next customer
-                self.logger.info(f"❌ No match for {order_number} with customer {customer_number}")
-                
-            except Exception as e:
-                self.logger.error(f"Error testing {order_number} with {customer_number}: {e}")
-                order_result["error"] = str(e)
-                continue
+                self.logger.debug("❌ No match for %s with customer %s", order_number, customer_number)
+        finally:
+            found.set()
+            for future in futures:
+                future.cancel()
         
         # If we get here, no customer matched
-        self.logger.warning(f"❌ No match found for order {order_number} after trying {len(customer_numbers)} customers")
+        self.logger.warning("❌ No match found for order %s after trying %d customers", order_number, len(customer_numbers))
         return order_result
     
+    def _probe(self, order_number, customer_number, found):
+        """
+        Test one customer for an order on a pooled browser
+        
+        Args:
+            order_number (str): Order number to test
+            customer_number (str): Customer number to test
+            found (threading.Event): Set once any customer matched this order
+            
+        Returns:
+            dict: Tracking results, or None if the order was already matched
+        """
+        if found.is_set():
+            return None
+        
+        self.logger.info("Testing %s with customer %s", order_number, customer_number)
+        return self.pool.track_order(order_number, customer_number)
+    
     def extract_order_status(self, text):
         """Extract order status from tracking text"""
-        if "delivered" in text.lower():
-            return "Delivered"
-        elif "in progress" in text.lower():
-            return "In Progress"
-        elif "ready to ship" in text.lower():
-            return "Ready to Ship"
-        else:
-            return "Unknown"
+        keywords = _scan_keywords(text)
+        for keyword, status in _STATUS_KEYWORDS:
+            if keyword in keywords:
+                return status
+        return "Unknown"
     
     def extract_delivery_date(self, text):
         """Extract delivery date from tracking text"""
-        import re
-        # Look for date patterns like "Feb 01, 2025"
-        date_pattern = r'(\w{3}\s+\d{1,2},\s+\d{4})'
-        match = re.search(date_pattern, text)
+        match = _DATE_RE.search(text)
         return match.group(1) if match else None
     
     def extract_total_amount(self, text):
         """Extract total amount from tracking text"""
-        import re
-        # Look for AED amounts
-        amount_pattern = r'AED\s+([\d,]+\.?\d*)'
-        matches = re.findall(amount_pattern, text)
+        matches = _AMOUNT_RE.findall(text)
         return matches[-1] if matches else None
     
     def extract_items(self, text):
         """Extract items from tracking text"""
         # Simple extraction - look for item names
-        items = []
-        if "Home Wireless" in text:
-            items.append("Home Wireless Plus")
-        if "New Sim" in text:
-            items.append("New Sim")
-        return items
-    
-    def save_progress_csv(self, results, filename):
-        """Save progress to CSV file"""
-        self.save_to_csv(results, filename)
+        keywords = _scan_keywords(text)
+        return [item for keyword, item in _ITEM_KEYWORDS if keyword in keywords]
     
-    def save_final_csv(self, results, filename):
-        """Save final results to CSV file"""
-        self.save_to_csv(results, filename)
+    def _open_writer(self, filename):
+        """Open the results CSV once and cache its writer"""
+        if self._progress_writer is None:
+            self._progress_file = open(filename, 'w', newline='', buffering=1 << 16, encoding='utf-8')
+            self._progress_writer = csv.DictWriter(self._progress_file, fieldnames=CSV_FIELDNAMES)
+            self._progress_writer.writeheader()
+            self._progress_rows = 0
+        return self._progress_writer
     
-    def save_to_csv(self, results, filename):
-        """Save results to CSV file"""
-        if not results:
-            return
-        
-        fieldnames = [
-            "order_number", "status", "matched_customer", "order_status", 
-            "delivery_date", "total_amount", "items", "attempts", "error", "timestamp"
-        ]
+    def append_progress(self, result, filename):
+        """Append a single order result to the open results CSV file"""
+        writer = self._open_writer(filename)
+        writer.writerow(csv_row(result))
+        self._progress_rows += 1
         
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for result in results:
-                # Convert items list to string for CSV
-                if result.get("items"):
-                    result["items"] = ", ".join(result["items"])
-                
-                writer.writerow(result)
-        
-        self.logger.info(f"Results saved to CSV: {filename}")
+        if self._progress_rows % PROGRESS_FLUSH_EVERY == 0:
+            self._progress_file.flush()
+    
+    def close_progress(self):
+        """Flush and close the results CSV file"""
+        if self._progress_file:
+            self._progress_file.close()
+            self.logger.info(f"Results saved to CSV: {self._progress_file.name}")
+        self._progress_file = None
+        self._progress_writer = None
     
     def close(self):
-        """Close the tracker"""
-        if self.tracker:
-            self.tracker.close()
+        """Shut down the worker threads and close the browser pool"""
+        self.close_progress()
+        if self.executor:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+        if self.pool:
+            self.pool.close()
 
 def main():
     """Main function for batch processing"""
@@ -234,19 +476,16 @@ def main():
     
     try:
         # Process the batch
-        results = batch_tracker.process_batch(order_numbers, customer_numbers)
+        summary = batch_tracker.process_batch(order_numbers, customer_numbers)
         
         # Print summary
-        found_count = sum(1 for r in results if r["status"] == "found")
-        not_found_count = sum(1 for r in results if r["status"] == "not_found")
-        
         print(f"\n{'='*50}")
         print("BATCH PROCESSING SUMMARY")
         print(f"{'='*50}")
-        print(f"Total Orders Processed: {len(results)}")
-        print(f"Orders Found: {found_count}")
-        print(f"Orders Not Found: {not_found_count}")
-        print(f"Success Rate: {(found_count/len(results)*100):.1f}%")
+        print(f"Total Orders Processed: {summary['processed']}")
+        print(f"Orders Found: {summary['found']}")
+        print(f"Orders Not Found: {summary['not_found']}")
+        print(f"Success Rate: {(summary['found']/summary['processed']*100):.1f}%")
         
     except Exception as e:
         print(f"Error in batch processing: {e}")
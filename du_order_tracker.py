@@ -4,8 +4,9 @@ Du Order Tracker
 A tool to automatically track orders on du.ae website
 """
 
-import time
+import itertools
 import logging
+from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -15,16 +16,78 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import json
 import os
 
+# Generated filenames share the process start time plus a running counter,
+# so files saved within the same second (or by pooled trackers) never collide
+_RUN_STAMP = datetime.now().strftime("%Y%m%d_%H%M%S")
+_file_counter = itertools.count(1)
+
+def _now():
+    """Current local time formatted like 2025-09-29 17:56:47"""
+    return datetime.now().isoformat(sep=' ', timespec='seconds')
+
+def _unique_filename(prefix, extension):
+    """Filename like order_data_20250929_175647_0001.json that is unique within this process"""
+    return f"{prefix}_{_RUN_STAMP}_{next(_file_counter):04d}.{extension}"
+
+# Tracking form fields
+ORDER_INPUT_SELECTOR = "#command > div.form__inner > div:nth-child(1) > input[type=text]"
+MOBILE_INPUT_SELECTOR = "#command > div.form__inner > div:nth-child(2) > input"
+TRACK_BUTTON_SELECTOR = "#command > div.form-section > button"
+
+# Reads the error banner, order status and tracking details in one WebDriver round trip.
+# Errors are looked up in error/alert containers only rather than scanning every text node.
+# Elements marked data-stale belong to a previous probe on the same page and are ignored.
+_PAGE_STATE_SCRIPT = """
+const fresh = selector => Array.from(document.querySelectorAll(selector))
+    .filter(e => !e.hasAttribute('data-stale'));
+const errorPattern = /Errors were found|Please check the errors|Invalid|not found/;
+const errorEl = fresh("[class*='error'], [class*='alert'], [role='alert']")
+    .find(e => errorPattern.test(e.innerText || ''));
+const statusEl = fresh(".order-status, .status, [class*='status']")[0];
+return {
+    error: !!errorEl,
+    errorText: errorEl ? errorEl.innerText : null,
+    status: statusEl ? statusEl.innerText : null,
+    tracking: fresh(".tracking-info, .order-details, [class*='tracking']")
+        .map(e => [e.getAttribute('class'), e.innerText])
+};
+"""
+
+# Fills and submits the form already on the page in one round trip. The previous
+# probe's answer is marked stale first so it can't be read as this probe's answer.
+# Returns false when the form isn't there.
+_SUBMIT_FORM_SCRIPT = f"""
+const [order, mobile] = arguments;
+const orderInput = document.querySelector("{ORDER_INPUT_SELECTOR}");
+const mobileInput = document.querySelector("{MOBILE_INPUT_SELECTOR}");
+const button = document.querySelector("{TRACK_BUTTON_SELECTOR}")
+    || document.querySelector("#command button[type='submit']");
+if (!orderInput || !mobileInput || !button) return false;
+document.querySelectorAll(
+    "[class*='error'], [class*='alert'], [role='alert'], .order-status, .status, [class*='status'], "
+    + ".tracking-info, .order-details, [class*='tracking']"
+).forEach(e => e.setAttribute('data-stale', ''));
+for (const [input, value] of [[orderInput, order], [mobileInput, mobile]]) {{
+    input.value = value;
+    input.dispatchEvent(new Event('input', {{bubbles: true}}));
+    input.dispatchEvent(new Event('change', {{bubbles: true}}));
+}}
+button.click();
+return true;
+"""
+
 class DuOrderTracker:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, debug=False):
         """
         Initialize the Du Order Tracker
         
         Args:
             headless (bool): Run browser in headless mode
+            debug (bool): Keep page source and a screenshot of every result
         """
         self.url = "https://shop.du.ae/en/order-tracking"
         self.driver = None
+        self.debug = debug
         self.setup_logging()
         self.setup_driver(headless)
     
@@ -51,6 +114,19 @@ class DuOrderTracker:
         chrome_options.add_argument("--window-size=1920,1080")
         chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
         
+        # Skip resources the tracking form doesn't need to speed up page loads
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--disable-background-networking")
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.stylesheets": 2,
+            "profile.managed_default_content_settings.fonts": 2
+        })
+        
+        # Return from driver.get() at DOMContentLoaded instead of the full load event
+        chrome_options.page_load_strategy = 'eager'
+        
         try:
             self.driver = webdriver.Chrome(options=chrome_options)
             self.logger.info("Chrome WebDriver initialized successfully")
@@ -70,7 +146,7 @@ class DuOrderTracker:
             dict: Order tracking results
         """
         try:
-            self.logger.info(f"Starting order tracking for order: {order_number}")
+            self.logger.info("Starting order tracking for order: %s", order_number)
             
             # Navigate to the order tracking page
             self.driver.get(self.url)
@@ -82,11 +158,11 @@ class DuOrderTracker:
             # Find and fill order number field
             try:
                 order_input = wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "#command > div.form__inner > div:nth-child(1) > input[type=text]"))
+                    EC.presence_of_element_located((By.CSS_SELECTOR, ORDER_INPUT_SELECTOR))
                 )
                 order_input.clear()
                 order_input.send_keys(order_number)
-                self.logger.info(f"Entered order number: {order_number}")
+                self.logger.info("Entered order number: %s", order_number)
             except TimeoutException:
                 self.logger.error("Could not find order number input field")
                 raise
@@ -94,11 +170,11 @@ class DuOrderTracker:
             # Find and fill mobile number field
             try:
                 mobile_input = wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "#command > div.form__inner > div:nth-child(2) > input"))
+                    EC.presence_of_element_located((By.CSS_SELECTOR, MOBILE_INPUT_SELECTOR))
                 )
                 mobile_input.clear()
                 mobile_input.send_keys(mobile_number)
-                self.logger.info(f"Entered mobile number: {mobile_number}")
+                self.logger.info("Entered mobile number: %s", mobile_number)
             except TimeoutException:
                 self.logger.error("Could not find mobile number input field")
                 raise
@@ -106,7 +182,7 @@ class DuOrderTracker:
             # Find and click track button
             try:
                 track_button = wait.until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "#command > div.form-section > button"))
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, TRACK_BUTTON_SELECTOR))
                 )
                 track_button.click()
                 self.logger.info("Clicked track order button")
@@ -125,80 +201,139 @@ class DuOrderTracker:
                         self.logger.error("Could not find track button")
                         raise
             
-            # Wait for results to load and check for errors
-            self.logger.info("Waiting for page to load...")
-            time.sleep(3)  # Reduced wait time
-            
-            # Check for error messages first
-            try:
-                error_elements = self.driver.find_elements(By.XPATH, "//*[contains(text(), 'Errors were found') or contains(text(), 'Please check the errors') or contains(text(), 'Invalid') or contains(text(), 'not found')]")
-                if error_elements:
-                    self.logger.info("❌ Error detected: Order/customer mismatch - moving to next customer")
-                    return {"error": "Order/customer mismatch", "status": "no_match"}
-            except Exception as e:
-                self.logger.debug(f"Error checking for error messages: {e}")
+            return self.collect_results()
             
-            # If no errors, wait a bit more for valid results
-            time.sleep(2)
-            self.logger.info("Wait completed, proceeding to capture results")
-            
-            # Capture the results
-            results = self.capture_results()
-            
-            # Save data in separate file as requested
-            self.save_data_separate_file(results)
+        except Exception as e:
+            self.logger.error("Error tracking order: %s", e)
+            return {"error": str(e)}
+    
+    def ensure_form_loaded(self):
+        """Open the order tracking page unless its form is already showing"""
+        if self.driver.find_elements(By.CSS_SELECTOR, ORDER_INPUT_SELECTOR):
+            return
+        
+        self.driver.get(self.url)
+        WebDriverWait(self.driver, 10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, ORDER_INPUT_SELECTOR))
+        )
+        self.logger.info("Navigated to du.ae order tracking page")
+    
+    def track_order_fast(self, order_number, mobile_number):
+        """
+        Track order by re-submitting the form already open in the browser
+        
+        Skips the page load and key-by-key typing of track_order; falls back to
+        track_order when the form can't be found.
+        
+        Args:
+            order_number (str): Order number (e.g., CM0002680507)
+            mobile_number (str): Mobile number (e.g., 0561716359)
+        
+        Returns:
+            dict: Order tracking results
+        """
+        try:
+            self.ensure_form_loaded()
+            if not self.driver.execute_script(_SUBMIT_FORM_SCRIPT, order_number, mobile_number):
+                self.logger.warning("Tracking form not found, falling back to a full page load")
+                return self.track_order(order_number, mobile_number)
             
-            return results
+            return self.collect_results()
             
         except Exception as e:
-            self.logger.error(f"Error tracking order: {e}")
+            self.logger.error("Error tracking order: %s", e)
             return {"error": str(e)}
     
-    def capture_results(self):
+    def collect_results(self):
+        """
+        Wait for the submitted form to answer and read the outcome
+        
+        Returns:
+            dict: Order tracking results, or a no_match error
+        """
+        # Wait for either the error banner or the tracking results instead of a fixed sleep
+        self.logger.info("Waiting for page to load...")
+        try:
+            page_state = WebDriverWait(self.driver, 8).until(
+                lambda driver: self._page_state_if_answered()
+            )
+        except TimeoutException:
+            self.logger.warning("Timed out waiting for tracking response, checking page as-is")
+            page_state = self.read_page_state()
+        
+        # Check for error messages first
+        if page_state["error"]:
+            self.logger.info("❌ Error detected: Order/customer mismatch - moving to next customer")
+            return {"error": "Order/customer mismatch", "status": "no_match"}
+        
+        self.logger.info("Wait completed, proceeding to capture results")
+        
+        # Capture the results
+        results = self.capture_results(page_state)
+        
+        # Save data in separate file as requested, only when there is something to save
+        if results.get("tracking_info"):
+            self.save_data_separate_file(results)
+        
+        return results
+    
+    def read_page_state(self):
+        """
+        Read the error banner, order status and tracking details from the page
+        
+        Returns:
+            dict: Page state with error, errorText, status and tracking keys
+        """
+        return self.driver.execute_script(_PAGE_STATE_SCRIPT)
+    
+    def _page_state_if_answered(self):
+        """Page state once the form shows an error or tracking details, else False"""
+        page_state = self.read_page_state()
+        if page_state["error"] or page_state["tracking"]:
+            return page_state
+        return False
+    
+    def capture_results(self, page_state=None):
         """
         Capture the order tracking results from the page
         
+        Args:
+            page_state (dict): Page state already read by track_order (optional)
+        
         Returns:
             dict: Order tracking information
         """
         results = {
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "timestamp": _now(),
             "order_status": "Unknown",
-            "tracking_info": {},
-            "page_content": ""
+            "tracking_info": {}
         }
         
         try:
-            # Wait for results to appear
-            wait = WebDriverWait(self.driver, 10)
+            if page_state is None:
+                page_state = self.read_page_state()
             
-            # Try to find order status information
-            try:
-                status_element = wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, ".order-status, .status, [class*='status']"))
-                )
-                results["order_status"] = status_element.text
-                self.logger.info(f"Found order status: {results['order_status']}")
-            except TimeoutException:
+            # Order status information
+            if page_state["status"]:
+                results["order_status"] = page_state["status"]
+                self.logger.info("Found order status: %s", results["order_status"])
+            else:
                 self.logger.warning("Could not find order status element")
             
-            # Try to find tracking details
-            try:
-                tracking_elements = self.driver.find_elements(By.CSS_SELECTOR, ".tracking-info, .order-details, [class*='tracking']")
-                for element in tracking_elements:
-                    if element.text.strip():
-                        results["tracking_info"][element.get_attribute("class") or "info"] = element.text
-            except Exception as e:
-                self.logger.warning(f"Could not extract tracking details: {e}")
-            
-            # Capture page content for manual review
-            results["page_content"] = self.driver.page_source
+            # Tracking details
+            for class_name, text in page_state["tracking"]:
+                if text and text.strip():
+                    results["tracking_info"][class_name or "info"] = text
             
-            # Take a screenshot for reference
-            screenshot_path = f"order_tracking_{int(time.time())}.png"
-            self.driver.save_screenshot(screenshot_path)
-            results["screenshot"] = screenshot_path
-            self.logger.info(f"Screenshot saved: {screenshot_path}")
+            if self.debug:
+                # Capture page content for manual review
+                results["page_content"] = self.driver.page_source
+                
+                # Take a screenshot for reference
+                screenshot_path = _unique_filename("order_tracking", "png")
+                self.driver.save_screenshot(screenshot_path)
+                results["screenshot"] = screenshot_path
+                self.logger.info(f"Screenshot saved: {screenshot_path}")
             
         except Exception as e:
             self.logger.error(f"Error capturing results: {e}")
@@ -215,8 +350,7 @@ class DuOrderTracker:
             filename (str): Optional filename
         """
         if not filename:
-            timestamp = time.strftime("%Y%m%d_%H%M%S")
-            filename = f"order_tracking_{timestamp}.json"
+            filename = _unique_filename("order_tracking", "json")
         
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(results, f, indent=2, ensure_ascii=False)
@@ -233,12 +367,11 @@ class DuOrderTracker:
             filename (str): Optional filename
         """
         if not filename:
-            timestamp = time.strftime("%Y%m%d_%H%M%S")
-            filename = f"order_data_{timestamp}.json"
+            filename = _unique_filename("order_data", "json")
         
         # Create a simplified data structure for the separate file
         data_to_save = {
-            "timestamp": results.get('timestamp', time.strftime("%Y-%m-%d %H:%M:%S")),
+            "timestamp": results.get('timestamp') or _now(),
             "order_status": results.get('order_status', 'Unknown'),
             "tracking_info": results.get('tracking_info', {}),
             "page_title": self.driver.title if self.driver else "Unknown",
@@ -264,7 +397,7 @@ def main():
     mobile_number = "0561716359"
     
     # Initialize tracker
-    tracker = DuOrderTracker(headless=False)  # Set to True for headless mode
+    tracker = DuOrderTracker(headless=False, debug=True)  # Set headless to True for headless mode
     
     try:
         # Track the order
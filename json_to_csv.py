@@ -6,8 +6,35 @@ Convert JSON tracking results to CSV format
 import json
 import csv
 import os
+import re
 from datetime import datetime
 
+try:
+    import ijson
+except ImportError:  # Fall back to loading the whole document with json
+    ijson = None
+
+# Precompiled patterns for the extract_* helpers
+_DATE_RE = re.compile(r'(\w{3}\s+\d{1,2},\s+\d{4})')  # e.g. "Feb 01, 2025"
+_AMOUNT_RE = re.compile(r'AED\s+([\d,]+\.?\d*)')
+_ORDER_RE = re.compile(r'CM\d+')
+
+# One scan finds every status keyword (any case) and item name (exact case)
+_KEYWORD_RE = re.compile(r'(?i:delivered|in progress|ready to ship)|Home Wireless|New Sim')
+_STATUS_KEYWORDS = (
+    ("delivered", "Delivered"),
+    ("in progress", "In Progress"),
+    ("ready to ship", "Ready to Ship"),
+)
+_ITEM_KEYWORDS = (
+    ("home wireless", "Home Wireless Plus"),
+    ("new sim", "New Sim"),
+)
+
+def _scan_keywords(text):
+    """Lowercased set of the status keywords and item names found in text"""
+    return {match.group(0).lower() for match in _KEYWORD_RE.finditer(text)}
+
 def convert_json_to_csv(json_file, csv_file=None):
     """
     Convert JSON tracking results to CSV format
@@ -19,12 +46,8 @@ def convert_json_to_csv(json_file, csv_file=None):
     if not csv_file:
         csv_file = json_file.replace('.json', '.csv')
     
-    # Read JSON file
-    with open(json_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    # Extract tracking information
-    tracking_info = data.get('tracking_info', {})
+    # Read only the fields we need from the JSON file
+    tracking_info, timestamp = load_tracking_fields(json_file)
     
     # Create CSV data
     csv_data = []
@@ -46,7 +69,7 @@ def convert_json_to_csv(json_file, csv_file=None):
                 'total_amount': total_amount,
                 'items': items,
                 'raw_data': value,
-                'timestamp': data.get('timestamp', datetime.now().isoformat())
+                'timestamp': timestamp or datetime.now().isoformat()
             })
     
     # Write to CSV
@@ -62,48 +85,65 @@ def convert_json_to_csv(json_file, csv_file=None):
     else:
         print("❌ No tracking data found to convert")
 
+def load_tracking_fields(json_file):
+    """
+    Read tracking_info and timestamp from a tracking results JSON file
+    
+    With ijson installed the file is streamed, so large fields such as
+    page_content are never materialized.
+    
+    Args:
+        json_file (str): Path to JSON file
+        
+    Returns:
+        tuple: (tracking_info dict, timestamp or None)
+    """
+    if ijson is None:
+        with open(json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data.get('tracking_info', {}), data.get('timestamp')
+    
+    tracking_info = {}
+    timestamp = None
+    key = None
+    
+    with open(json_file, 'rb') as f:
+        for prefix, event, value in ijson.parse(f):
+            if prefix == 'timestamp' and event == 'string':
+                timestamp = value
+            elif prefix == 'tracking_info' and event == 'map_key':
+                key = value
+            elif prefix.startswith('tracking_info.') and event == 'string':
+                tracking_info[key] = value
+    
+    return tracking_info, timestamp
+
 def extract_order_status(text):
     """Extract order status from text"""
-    if "delivered" in text.lower():
-        return "Delivered"
-    elif "in progress" in text.lower():
-        return "In Progress"
-    elif "ready to ship" in text.lower():
-        return "Ready to Ship"
-    else:
-        return "Unknown"
+    keywords = _scan_keywords(text)
+    for keyword, status in _STATUS_KEYWORDS:
+        if keyword in keywords:
+            return status
+    return "Unknown"
 
 def extract_delivery_date(text):
     """Extract delivery date from text"""
-    import re
-    # Look for date patterns like "Feb 01, 2025"
-    date_pattern = r'(\w{3}\s+\d{1,2},\s+\d{4})'
-    match = re.search(date_pattern, text)
+    match = _DATE_RE.search(text)
     return match.group(1) if match else None
 
 def extract_total_amount(text):
     """Extract total amount from text"""
-    import re
-    # Look for AED amounts
-    amount_pattern = r'AED\s+([\d,]+\.?\d*)'
-    matches = re.findall(amount_pattern, text)
+    matches = _AMOUNT_RE.findall(text)
     return matches[-1] if matches else None
 
 def extract_items(text):
     """Extract items from text"""
-    items = []
-    if "Home Wireless" in text:
-        items.append("Home Wireless Plus")
-    if "New Sim" in text:
-        items.append("New Sim")
-    return ", ".join(items)
+    keywords = _scan_keywords(text)
+    return ", ".join(item for keyword, item in _ITEM_KEYWORDS if keyword in keywords)
 
 def extract_order_number(text):
     """Extract order number from text"""
-    import re
-    # Look for CM numbers
-    order_pattern = r'CM\d+'
-    match = re.search(order_pattern, text)
+    match = _ORDER_RE.search(text)
     return match.group(0) if match else None
 
 def main():
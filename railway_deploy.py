@@ -5,9 +5,73 @@ Optimized for cloud deployment with headless browser
 """
 
 import os
-import time
+import hmac
+import signal
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from robust_batch_tracker import RobustBatchTracker, load_data_from_files
 
+RESULTS_CSV = "robust_batch_results.csv"
+
+def keep_alive_for_download(results_file=RESULTS_CSV, timeout=3600):
+    """
+    Keep the process alive until the results are downloaded, SIGTERM arrives or timeout passes
+    
+    When Railway provides $PORT and $RESULTS_TOKEN is set, the results file is served at
+    /<RESULTS_TOKEN>/<results_file>; "/" answers 200 so health checks pass and every
+    other path gets 404. The CSV holds customer numbers, so it is never served without the token.
+    
+    Args:
+        results_file (str): File to offer for download
+        timeout (int): Maximum seconds to stay alive
+    """
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    
+    token = os.environ.get("RESULTS_TOKEN")
+    download_path = f"/{token}/{results_file}" if token else None
+    
+    class ResultsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/":
+                self.send_response(200)
+                self.end_headers()
+                self.wfile.write(b"ok")
+                return
+            
+            if (not download_path or not hmac.compare_digest(self.path, download_path)
+                    or not os.path.exists(results_file)):
+                self.send_response(404)
+                self.end_headers()
+                return
+            
+            with open(results_file, 'rb') as f:
+                body = f.read()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            
+            # Results are downloaded, nothing left to stay alive for
+            stop.set()
+    
+    server = None
+    port = os.environ.get("PORT")
+    if port:
+        server = ThreadingHTTPServer(("", int(port)), ResultsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        if download_path:
+            print(f"   • Download results from /<RESULTS_TOKEN>/{results_file} on port {port}")
+        else:
+            print("   • RESULTS_TOKEN is not set, results are not served for download")
+    
+    stop.wait(timeout)
+    
+    if server:
+        server.shutdown()
+        server.server_close()
+
 def main():
     """Railway deployment main function"""
     print("🚀 Railway Batch Order Tracker Starting...")
@@ -24,6 +88,7 @@ def main():
     
     # Initialize tracker with headless mode for cloud
     tracker = RobustBatchTracker(headless=True)
+    completed = False
     
     try:
         print("🔄 Starting batch processing on Railway...")
@@ -33,11 +98,16 @@ def main():
         print()
         
         # Process the batch
-        results = tracker.process_batch_with_resume(order_numbers, customer_numbers)
+        results = tracker.process_batch_with_resume(order_numbers, customer_numbers, output_csv=RESULTS_CSV)
         
         # Print final summary
-        found_count = sum(1 for r in results if r["status"] == "found")
-        not_found_count = sum(1 for r in results if r["status"] == "not_found")
+        found_count = not_found_count = total_attempts = 0
+        for r in results:
+            total_attempts += r["attempts"]
+            if r["status"] == "found":
+                found_count += 1
+            elif r["status"] == "not_found":
+                not_found_count += 1
         
         print(f"\n{'='*60}")
         print("🎉 RAILWAY BATCH PROCESSING COMPLETED!")
@@ -45,12 +115,9 @@ def main():
         print(f"✅ Orders Found: {found_count}")
         print(f"❌ Orders Not Found: {not_found_count}")
         print(f"📊 Success Rate: {(found_count/len(results)*100):.1f}%")
-        print(f"🔢 Total Attempts: {sum(r['attempts'] for r in results):,}")
-        print(f"📁 Results saved to: robust_batch_results.csv")
-        
-        # Keep the process alive for Railway
-        print("\n🔄 Process completed. Keeping alive for file access...")
-        time.sleep(3600)  # Keep alive for 1 hour
+        print(f"🔢 Total Attempts: {total_attempts:,}")
+        print(f"📁 Results saved to: {RESULTS_CSV}")
+        completed = True
         
     except KeyboardInterrupt:
         print("\n⚠️  Process interrupted - progress saved!")
@@ -58,7 +125,13 @@ def main():
         print(f"\n❌ Error: {e}")
         print("   Progress saved - you can resume later.")
     finally:
+        # Close the browser before idling; serving files doesn't need Chrome
         tracker.close()
+    
+    if completed:
+        # Keep the process alive for Railway
+        print("\n🔄 Process completed. Keeping alive for file access...")
+        keep_alive_for_download()
 
 if __name__ == "__main__":
     main()
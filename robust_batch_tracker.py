@@ -10,63 +10,173 @@ import json
 import time
 import logging
 import os
+import queue
+import re
+import mmap
+import threading
+import functools
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from du_order_tracker import DuOrderTracker
+from batch_order_tracker import BrowserPool, CSV_FIELDNAMES, csv_row, end_with_newline
+
+try:
+    import orjson
+except ImportError:  # Fall back to the json module for the resume log
+    orjson = None
+
+# Precompiled patterns for the extract_* helpers
+_DATE_RE = re.compile(r'(\w{3}\s+\d{1,2},\s+\d{4})')  # e.g. "Feb 01, 2025"
+_AMOUNT_RE = re.compile(r'AED\s+([\d,]+\.?\d*)')
+# 8 ASCII digits per customer number, no separators
+CUSTOMERS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "customers.bin")
+CUSTOMER_RECORD_SIZE = 8
+
+# Flush the resume log and results CSV and record the resume index every this many orders
+CHECKPOINT_EVERY = 10
+
+# Customers that matched recently are tried first; this many are remembered
+RECENT_MATCHES_MAX = 20
+
+# Pause between orders only while the site is failing: each failing order doubles
+# the pause (up to the max), each run of clean orders halves it back towards zero
+MIN_BACKOFF_INTERVAL = 0.25
+MAX_ORDER_INTERVAL = 2.0
+CLEAN_STREAK_TO_RELAX = 5
+
+# Queue handler on the root logger and the listener writing its records out, shared
+# by every tracker in the process; _log_users counts the trackers still open
+_log_lock = threading.Lock()
+_log_handler = None
+_log_listener = None
+_log_users = 0
+
+_ITEM_TOKENS = (
+    ("Home Wireless", "Home Wireless Plus"),
+    ("New Sim", "New Sim"),
+)
 
 class RobustBatchTracker:
-    def __init__(self, headless=True, resume_file="batch_progress.json"):
+    def __init__(self, headless=True, resume_file="batch_progress.jsonl", pool_size=4, max_uses=50):
         """
         Initialize the Robust Batch Tracker
         
         Args:
             headless (bool): Run browser in headless mode
-            resume_file (str): File to save progress for resuming
+            resume_file (str): JSON Lines file that completed orders are appended to for resuming
+            pool_size (int): Number of browsers testing customers concurrently
+            max_uses (int): Recycle each browser after this many attempts
         """
-        self.tracker = None
+        self.pool = None
+        self.executor = None
+        self._logging_attached = False
         self.resume_file = resume_file
+        self.meta_file = f"{os.path.splitext(resume_file)[0]}_meta.json"
+        self._checkpoint_every = CHECKPOINT_EVERY
+        self._recent_matches = OrderedDict()
+        self._min_interval = 0.0
+        self._last_call = time.monotonic()
+        self._clean_streak = 0
         self.setup_logging()
-        self.setup_tracker(headless)
+        self.setup_tracker(headless, pool_size, max_uses)
     
     def setup_logging(self):
-        """Setup logging configuration"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('robust_batch_tracker.log'),
-                logging.StreamHandler()
-            ]
-        )
+        """Setup logging configuration; records are written out on a background thread"""
+        _attach_queue_logging()
+        self._logging_attached = True
         self.logger = logging.getLogger(__name__)
     
-    def setup_tracker(self, headless=True):
-        """Setup the order tracker"""
+    def setup_tracker(self, headless=True, pool_size=4, max_uses=50):
+        """Setup the browser pool and the worker threads that share it"""
         try:
-            self.tracker = DuOrderTracker(headless=headless)
-            self.logger.info("Robust Batch Tracker initialized successfully")
+            # Each pooled browser keeps the form open and re-submits it per customer
+            self.pool = BrowserPool(size=pool_size, headless=headless, max_uses=max_uses, fast=True)
+            self.executor = ThreadPoolExecutor(max_workers=pool_size)
+            self.logger.info(f"Robust Batch Tracker initialized with {pool_size} browsers")
         except Exception as e:
             self.logger.error(f"Failed to initialize tracker: {e}")
             raise
     
     def load_progress(self):
-        """Load progress from resume file"""
-        if os.path.exists(self.resume_file):
-            try:
-                with open(self.resume_file, 'r') as f:
-                    progress = json.load(f)
-                self.logger.info(f"Loaded progress: {progress['completed_orders']} orders completed")
-                return progress
-            except Exception as e:
-                self.logger.error(f"Error loading progress: {e}")
-                return None
-        return None
+        """
+        Rebuild progress from the resume log and its meta file
+        
+        Returns:
+            dict: completed_orders (set), results and last_processed_index, or None when there is nothing to resume
+        """
+        if not os.path.exists(self.resume_file):
+            return None
+        
+        try:
+            # Stream the log one order at a time, building both views as we go
+            results = []
+            completed_orders = set()
+            with open(self.resume_file, 'rb') as f:
+                for line in f:
+                    try:
+                        order_result = _parse_json_line(line)
+                    except ValueError:
+                        # A run killed mid-write can leave a truncated last line
+                        continue
+                    results.append(order_result)
+                    completed_orders.add(order_result['order_number'])
+            
+            meta = {}
+            if os.path.exists(self.meta_file):
+                with open(self.meta_file, 'r') as f:
+                    meta = json.load(f)
+            self._recent_matches = OrderedDict.fromkeys(meta.get('recent_matches', []))
+            
+            progress = {
+                'completed_orders': completed_orders,
+                'results': results,
+                'last_processed_index': meta.get('last_processed_index', 0)
+            }
+            self.logger.info(f"Loaded progress: {len(results)} orders completed")
+            return progress
+        except Exception as e:
+            self.logger.error(f"Error loading progress: {e}")
+            return None
+    
+    def save_progress(self, progress_log, order_result):
+        """
+        Append a completed order to the resume log (written out at the next checkpoint)
+        
+        Args:
+            progress_log (file): Resume log opened for appending
+            order_result (dict): Result of the order that just completed
+        """
+        try:
+            progress_log.write(_json_line(order_result))
+        except Exception as e:
+            self.logger.error(f"Error saving progress: {e}")
     
-    def save_progress(self, progress):
-        """Save progress to resume file"""
+    def checkpoint(self, progress_log, csvfile, index, completed, timestamp):
+        """
+        Flush the resume log and results CSV and record the resume index
+        
+        Args:
+            progress_log (file): Resume log opened for appending
+            csvfile (file): Results CSV opened for appending
+            index (int): Position of the last completed order in the batch
+            completed (int): Number of orders completed so far
+            timestamp (str): Timestamp of the last completed order
+        """
         try:
-            with open(self.resume_file, 'w') as f:
-                json.dump(progress, f, indent=2)
-            self.logger.info(f"Progress saved: {progress['completed_orders']} orders completed")
+            progress_log.flush()
+            csvfile.flush()
+            
+            # Write a temporary file and swap it in, so a kill mid-write never leaves a truncated meta file
+            tmp_file = f"{self.meta_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump({
+                    'last_processed_index': index,
+                    'recent_matches': list(self._recent_matches),
+                    'timestamp': timestamp
+                }, f)
+            os.replace(tmp_file, self.meta_file)
+            self.logger.info(f"Progress saved: {completed} orders completed")
         except Exception as e:
             self.logger.error(f"Error saving progress: {e}")
     
@@ -83,7 +193,7 @@ class RobustBatchTracker:
         progress = self.load_progress()
         
         if progress:
-            completed_orders = set(progress['completed_orders'])
+            completed_orders = progress['completed_orders']
             results = progress.get('results', [])
             start_index = progress.get('last_processed_index', 0)
             self.logger.info(f"Resuming from order {start_index + 1}")
@@ -98,52 +208,96 @@ class RobustBatchTracker:
         
         self.logger.info(f"Processing {total_orders} orders × {total_customers} customers")
         
-        for i in range(start_index, total_orders):
-            order_number = order_numbers[i]
-            
-            # Skip if already completed
-            if order_number in completed_orders:
-                self.logger.info(f"Skipping already completed order: {order_number}")
-                continue
-            
-            self.logger.info(f"Processing order {i+1}/{total_orders}: {order_number}")
+        # Work out the remaining orders once, keeping each one's position in the batch
+        pending_orders = [
+            (i, order_number)
+            for i, order_number in enumerate(order_numbers[start_index:], start_index)
+            if order_number not in completed_orders
+        ]
+        
+        # A killed run can leave half a line at the end of the log; new lines must not join it
+        end_with_newline(self.resume_file)
+        
+        # Rows go straight into output_csv. On resume it is rewritten from the resume log
+        # first, since a kill between the two flushes can leave the CSV behind the log
+        with open(output_csv, 'w', newline='', encoding='utf-8') as csvfile, \
+                open(self.resume_file, 'a', encoding='utf-8') as progress_log:
+            writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(csv_row(result) for result in results)
             
+            last_index = start_index
+            last_timestamp = None
+            unsaved = 0
             try:
-                order_result = self.process_single_order(order_number, customer_numbers)
-                results.append(order_result)
-                completed_orders.add(order_number)
-                
-                # Save progress after each order
-                progress_data = {
-                    'completed_orders': list(completed_orders),
-                    'results': results,
-                    'last_processed_index': i,
-                    'timestamp': datetime.now().isoformat()
-                }
-                self.save_progress(progress_data)
-                
-                # Save CSV after each order
-                self.save_results_csv(results, f"progress_{output_csv}")
-                
-                # Small delay between orders
-                time.sleep(2)
-                
-            except Exception as e:
-                self.logger.error(f"Error processing order {order_number}: {e}")
-                # Continue with next order even if one fails
-                continue
+                for i, order_number in pending_orders:
+                    self.logger.info(f"Processing order {i+1}/{total_orders}: {order_number}")
+                    
+                    try:
+                        self.throttle()
+                        order_result = self.process_single_order(order_number, customer_numbers)
+                        self.adjust_rate(order_result["error"] is None)
+                        results.append(order_result)
+                        completed_orders.add(order_number)
+                        
+                        # Record the order; files are flushed every few orders
+                        self.save_progress(progress_log, order_result)
+                        writer.writerow(csv_row(order_result))
+                        last_index = i
+                        last_timestamp = order_result["timestamp"]
+                        unsaved += 1
+                        if unsaved >= self._checkpoint_every:
+                            self.checkpoint(progress_log, csvfile, last_index, len(completed_orders), last_timestamp)
+                            unsaved = 0
+                        
+                    except Exception as e:
+                        self.logger.error(f"Error processing order {order_number}: {e}")
+                        self.adjust_rate(False)
+                        # Continue with next order even if one fails
+                        continue
+            finally:
+                # Save the rest on the way out too (including Ctrl+C); a hard kill
+                # loses at most the orders since the last checkpoint
+                if unsaved:
+                    self.checkpoint(progress_log, csvfile, last_index, len(completed_orders), last_timestamp)
         
-        # Save final results
-        self.save_results_csv(results, output_csv)
         self.logger.info(f"Batch processing completed. Results saved to {output_csv}")
         
-        # Clean up progress file
-        if os.path.exists(self.resume_file):
-            os.remove(self.resume_file)
-            self.logger.info("Progress file cleaned up")
+        # Clean up progress files
+        for path in (self.resume_file, self.meta_file):
+            if os.path.exists(path):
+                os.remove(path)
+        self.logger.info("Progress files cleaned up")
         
         return results
     
+    def throttle(self):
+        """Wait until the current minimum interval since the previous order has passed"""
+        sleep_for = self._min_interval - (time.monotonic() - self._last_call)
+        if sleep_for > 0:
+            time.sleep(sleep_for)
+        self._last_call = time.monotonic()
+    
+    def adjust_rate(self, clean):
+        """
+        Back off after a failing order and relax again after a run of clean ones
+        
+        Args:
+            clean (bool): Whether the order finished without errors
+        """
+        if not clean:
+            self._clean_streak = 0
+            self._min_interval = min(MAX_ORDER_INTERVAL, max(MIN_BACKOFF_INTERVAL, self._min_interval * 2))
+            self.logger.warning(f"Errors from the site, pausing {self._min_interval:.2f}s between orders")
+            return
+        
+        self._clean_streak += 1
+        if self._min_interval and self._clean_streak >= CLEAN_STREAK_TO_RELAX:
+            self._clean_streak = 0
+            self._min_interval /= 2
+            if self._min_interval < MIN_BACKOFF_INTERVAL:
+                self._min_interval = 0.0
+    
     def process_single_order(self, order_number, customer_numbers):
         """
         Process a single order against all customer numbers
@@ -155,6 +309,7 @@ class RobustBatchTracker:
         Returns:
             dict: Result for this order
         """
+        ts = datetime.now().isoformat()
         order_result = {
             "order_number": order_number,
             "status": "not_found",
@@ -165,23 +320,50 @@ class RobustBatchTracker:
             "items": None,
             "attempts": 0,
             "error": None,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": ts
         }
         
-        for customer_number in customer_numbers:
-            order_result["attempts"] += 1
-            
-            try:
-                self.logger.info(f"Testing {order_number} with customer {customer_number}")
+        # Customers that matched recent orders go first, since matches tend to come in runs
+        known = set(customer_numbers)
+        recent = [c for c in self._recent_matches if c in known]
+        ordered = recent + [c for c in customer_numbers if c not in self._recent_matches]
+        
+        # Fan the customers out over the browser pool; the first match cancels the rest
+        found = threading.Event()
+        futures = {
+            self.executor.submit(self._probe, order_number, customer_number, found): customer_number
+            for customer_number in ordered
+        }
+        
+        try:
+            for future in as_completed(futures):
+                customer_number = futures[future]
+                
+                try:
+                    results = future.result()
+                except Exception as e:
+                    order_result["attempts"] += 1
+                    self.logger.error(f"Error testing {order_number} with {customer_number}: {e}")
+                    order_result["error"] = str(e)
+                    continue
                 
-                # Track the order
-                results = self.tracker.track_order(order_number, customer_number)
+                # Skipped because another customer already matched
+                if results is None:
+                    continue
+                
+                order_result["attempts"] += 1
                 
                 # Check for error/mismatch first
                 if results.get("error") == "Order/customer mismatch":
-                    self.logger.info(f"❌ Mismatch: {order_number} with customer {customer_number}")
+                    self.logger.debug("❌ Mismatch: %s with customer %s", order_number, customer_number)
                     continue
                 
+                # The trackers catch their own exceptions and hand back the message instead
+                if results.get("error") is not None:
+                    self.logger.warning(f"Error testing {order_number} with {customer_number}: {results['error']}")
+                    order_result["error"] = results["error"]
+                    continue
+
                 # Check if we got valid results (not an error)
                 if "error" not in results and results.get("tracking_info"):
                     # Extract order information
@@ -189,129 +371,188 @@ class RobustBatchTracker:
                     
                     # Look for order status in the tracking info
                     for key, value in tracking_info.items():
-                        if "order status" in key.lower() or "delivered" in value.lower():
+                        value_lower = value.lower()
+                        if "order status" in key.lower() or "delivered" in value_lower:
                             order_result["status"] = "found"
                             order_result["matched_customer"] = customer_number
-                            order_result["order_status"] = self.extract_order_status(value)
+                            order_result["order_status"] = self.extract_order_status(value, value_lower)
                             order_result["delivery_date"] = self.extract_delivery_date(value)
                             order_result["total_amount"] = self.extract_total_amount(value)
                             order_result["items"] = self.extract_items(value)
+                            self.remember_match(customer_number)
                             
                             self.logger.info(f"✅ MATCH FOUND: {order_number} with customer {customer_number}")
                             return order_result
                 
                 # If no match found, continue to next customer
-                self.logger.info(f"❌ No match for {order_number} with customer {customer_number}")
-                
-            except Exception as e:
-                self.logger.error(f"Error testing {order_number} with {customer_number}: {e}")
-                order_result["error"] = str(e)
-                continue
+                self.logger.debug("❌ No match for %s with customer %s", order_number, customer_number)
+        finally:
+            found.set()
+            for future in futures:
+                future.cancel()
         
         # If we get here, no customer matched
         self.logger.warning(f"❌ No match found for order {order_number} after trying {len(customer_numbers)} customers")
         return order_result
     
-    def extract_order_status(self, text):
-        """Extract order status from tracking text"""
-        if "delivered" in text.lower():
-            return "Delivered"
-        elif "in progress" in text.lower():
-            return "In Progress"
-        elif "ready to ship" in text.lower():
-            return "Ready to Ship"
-        else:
-            return "Unknown"
+    def remember_match(self, customer_number):
+        """Move a matching customer to the front of the recent matches"""
+        self._recent_matches[customer_number] = None
+        self._recent_matches.move_to_end(customer_number, last=False)
+        while len(self._recent_matches) > RECENT_MATCHES_MAX:
+            self._recent_matches.popitem()
+    
+    def _probe(self, order_number, customer_number, found):
+        """
+        Test one customer for an order on a pooled browser
+        
+        Args:
+            order_number (str): Order number to test
+            customer_number (str): Customer number to test
+            found (threading.Event): Set once any customer matched this order
+            
+        Returns:
+            dict: Tracking results, or None if the order was already matched
+        """
+        if found.is_set():
+            return None
+        
+        self.logger.debug("Testing %s with customer %s", order_number, customer_number)
+        return self.pool.track_order(order_number, customer_number)
+    
+    def extract_order_status(self, text, text_lower=None):
+        """Extract order status from tracking text (text_lower: the same text already lowercased)"""
+        return _extract_status(text.lower() if text_lower is None else text_lower)
     
     def extract_delivery_date(self, text):
         """Extract delivery date from tracking text"""
-        import re
-        # Look for date patterns like "Feb 01, 2025"
-        date_pattern = r'(\w{3}\s+\d{1,2},\s+\d{4})'
-        match = re.search(date_pattern, text)
-        return match.group(1) if match else None
+        return _extract_date(text)
     
     def extract_total_amount(self, text):
         """Extract total amount from tracking text"""
-        import re
-        # Look for AED amounts
-        amount_pattern = r'AED\s+([\d,]+\.?\d*)'
-        matches = re.findall(amount_pattern, text)
-        return matches[-1] if matches else None
+        return _extract_amount(text)
     
     def extract_items(self, text):
         """Extract items from tracking text"""
-        # Simple extraction - look for item names
-        items = []
-        if "Home Wireless" in text:
-            items.append("Home Wireless Plus")
-        if "New Sim" in text:
-            items.append("New Sim")
-        return items
+        return list(_extract_items(text))
     
-    def save_results_csv(self, results, filename):
-        """Save results to CSV file"""
-        if not results:
-            return
-        
-        fieldnames = [
-            "order_number", "status", "matched_customer", "order_status", 
-            "delivery_date", "total_amount", "items", "attempts", "error", "timestamp"
-        ]
-        
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
+    def close(self):
+        """Stop the worker threads and close the browser pool"""
+        if self.executor:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+        if self.pool:
+            self.pool.close()
+        if self._logging_attached:
+            self._logging_attached = False
+            _detach_queue_logging()
+
+# Cached parsers behind the extract_* methods; templated pages repeat the same text
+
+@functools.lru_cache(maxsize=1024)
+def _extract_status(text_lower):
+    """Order status keyword found in already lowercased tracking text"""
+    if "delivered" in text_lower:
+        return "Delivered"
+    elif "in progress" in text_lower:
+        return "In Progress"
+    elif "ready to ship" in text_lower:
+        return "Ready to Ship"
+    else:
+        return "Unknown"
+
+@functools.lru_cache(maxsize=1024)
+def _extract_date(text):
+    """First date like "Feb 01, 2025" in tracking text"""
+    match = _DATE_RE.search(text)
+    return match.group(1) if match else None
+
+@functools.lru_cache(maxsize=1024)
+def _extract_amount(text):
+    """Last AED amount in tracking text"""
+    matches = _AMOUNT_RE.findall(text)
+    return matches[-1] if matches else None
+
+@functools.lru_cache(maxsize=1024)
+def _extract_items(text):
+    """Item names in tracking text, as a tuple so cached values stay immutable"""
+    # Simple extraction - look for item names
+    return tuple(item for token, item in _ITEM_TOKENS if token in text)
+
+def _attach_queue_logging():
+    """Route root logging through the shared queue handler, starting it for the first tracker"""
+    global _log_handler, _log_listener, _log_users
+    with _log_lock:
+        if _log_users == 0:
+            formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+            handlers = [
+                logging.FileHandler('robust_batch_tracker.log'),
+                logging.StreamHandler()
+            ]
+            for handler in handlers:
+                handler.setFormatter(formatter)
             
-            for result in results:
-                # Convert items list to string for CSV
-                if result.get("items"):
-                    result["items"] = ", ".join(result["items"])
-                
-                writer.writerow(result)
-        
-        self.logger.info(f"Results saved to CSV: {filename}")
+            # Callers only enqueue; the listener thread does the file and console writes
+            log_queue = queue.Queue(-1)
+            _log_handler = QueueHandler(log_queue)
+            _log_handler.setFormatter(logging.Formatter('%(message)s'))
+            _log_listener = QueueListener(log_queue, *handlers)
+            _log_listener.start()
+            
+            # Attached directly: basicConfig does nothing once another tracker has configured the root logger
+            root = logging.getLogger()
+            root.setLevel(logging.INFO)
+            root.addHandler(_log_handler)
+        _log_users += 1
+
+def _detach_queue_logging():
+    """Release the shared queue handler, removing it once the last tracker is closed"""
+    global _log_handler, _log_listener, _log_users
+    with _log_lock:
+        _log_users -= 1
+        if _log_users == 0:
+            logging.getLogger().removeHandler(_log_handler)
+            # Writes out anything still queued
+            _log_listener.stop()
+            for handler in _log_listener.handlers:
+                handler.close()
+            _log_handler = None
+            _log_listener = None
+
+def _json_line(obj):
+    """Serialize obj as a single JSON line"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode() + "\n"
+    return json.dumps(obj) + "\n"
+
+def _parse_json_line(line):
+    """Parse one JSON line (bytes or str)"""
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+def load_customer_numbers(path=CUSTOMERS_FILE):
+    """
+    Read customer numbers from a file of fixed-width records
     
-    def close(self):
-        """Close the tracker"""
-        if self.tracker:
-            self.tracker.close()
+    Args:
+        path (str): File holding CUSTOMER_RECORD_SIZE ASCII digits per customer
+        
+    Returns:
+        list: Customer numbers in file order
+    """
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return [
+            mm[start:start + CUSTOMER_RECORD_SIZE].decode('ascii')
+            for start in range(0, len(mm) - CUSTOMER_RECORD_SIZE + 1, CUSTOMER_RECORD_SIZE)
+        ]
 
 def load_data_from_files():
     """Load order and customer numbers from files"""
-    # Load customer numbers
-    customer_numbers = [
-        "27722242", "06564007", "67630940", "54125200", "02124059", "55308497", "51937865", "56600354",
-        "22767233", "02195850", "52061732", "49964116", "07044859", "57463568", "07086205", "44060166",
-        "28668092", "25615795", "02205658", "67822022", "07421159", "85890583", "29825284", "06664647",
-        "58161250", "00000000", "44732323", "89091031", "02880707", "51112422", "65727178", "58429866",
-        "27757795", "43440885", "55573361", "67736939", "58740405", "01065173", "07543613", "24657490",
-        "66382630", "08297176", "26924685", "09680762", "05707628", "56139964", "66447451", "44969503",
-        "53929432", "09698036", "85839688", "85781027", "85877087", "66876784", "55961312", "61064474",
-        "64466695", "55586115", "09430193", "07988535", "45660007", "06101119", "07302290", "57016655",
-        "05892895", "68030843", "67607073", "56334115", "67181917", "07645763", "59167443", "06208544",
-        "65340535", "52729759", "21318304", "05510075", "54539010", "28997693", "07882476", "28820304",
-        "02618165", "24092557", "28227971", "03998877", "56726743", "01546512", "86760879", "44993038",
-        "43559488", "04259170", "08956249", "81161796", "07717094", "06138291", "69369360", "59558998",
-        "63871828", "68950063", "56736704", "68798683", "21131061", "51661745", "26535497", "57080106",
-        "04765634", "63155227", "51674869", "21050867", "02077815", "62756674", "07130201", "56735764",
-        "27902323", "08800626", "02501554", "05558063", "09045753", "68406128", "01793463", "50000000",
-        "51620894", "51122792", "69520367", "03711199", "04700500", "27383881", "02469028", "45863240",
-        "86799283", "62449454", "51236390", "52558559", "04546665", "03711938", "88665588", "45450619",
-        "62217344", "09161078", "57553595", "44477754", "01524230", "52411593", "07784854", "02360476",
-        "59390184", "57542348", "07924126", "56735508", "42968164", "58391410", "21662598", "51293905",
-        "44851386", "07363701", "21901564", "54161242", "27423366", "29865202", "54241369", "22239387",
-        "58676912", "08077688", "63311001", "67035302", "54882665", "63896909", "01187775", "86596799",
-        "57110111", "65952736", "03326050", "64151756", "69302054", "69191993", "45838417", "64403376",
-        "65659789", "68230021", "23181878", "59175026", "65208425", "57163811", "09145451", "09180655",
-        "24967136", "42732830", "62525101", "88846346", "63989671", "27888347", "58527805", "06987286",
-        "53540799", "44396957", "58134927"
-    ]
+    # Customer numbers are fixed-width records in customers.bin, read through mmap
+    customer_numbers = load_customer_numbers()
     
     # Generate order numbers (CM0002153161 to CM0002155000)
-    order_numbers = []
-    for i in range(3161, 5001):
-        order_numbers.append(f"CM000215{i}")
+    order_numbers = [f"CM000215{i}" for i in range(3161, 5001)]
     
     return order_numbers, customer_numbers
 
@@ -333,8 +574,13 @@ def main():
         results = batch_tracker.process_batch_with_resume(order_numbers, customer_numbers)
         
         # Print summary
-        found_count = sum(1 for r in results if r["status"] == "found")
-        not_found_count = sum(1 for r in results if r["status"] == "not_found")
+        found_count = not_found_count = total_attempts = 0
+        for r in results:
+            total_attempts += r["attempts"]
+            if r["status"] == "found":
+                found_count += 1
+            elif r["status"] == "not_found":
+                not_found_count += 1
         
         print(f"\n{'='*60}")
         print("ROBUST BATCH PROCESSING SUMMARY")
@@ -343,7 +589,7 @@ def main():
         print(f"Orders Found: {found_count}")
         print(f"Orders Not Found: {not_found_count}")
         print(f"Success Rate: {(found_count/len(results)*100):.1f}%")
-        print(f"Total Attempts: {sum(r['attempts'] for r in results):,}")
+        print(f"Total Attempts: {total_attempts:,}")
         
     except KeyboardInterrupt:
         print("\n⚠️  Process interrupted by user. Progress saved - you can resume later.")
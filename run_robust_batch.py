@@ -33,8 +33,13 @@ def main():
         results = tracker.process_batch_with_resume(order_numbers, customer_numbers)
         
         # Print final summary
-        found_count = sum(1 for r in results if r["status"] == "found")
-        not_found_count = sum(1 for r in results if r["status"] == "not_found")
+        found_count = not_found_count = total_attempts = 0
+        for r in results:
+            total_attempts += r["attempts"]
+            if r["status"] == "found":
+                found_count += 1
+            elif r["status"] == "not_found":
+                not_found_count += 1
         
         print(f"\n{'='*60}")
         print("🎉 BATCH PROCESSING COMPLETED!")
@@ -42,7 +47,7 @@ def main():
         print(f"✅ Orders Found: {found_count}")
         print(f"❌ Orders Not Found: {not_found_count}")
         print(f"📊 Success Rate: {(found_count/len(results)*100):.1f}%")
-        print(f"🔢 Total Attempts: {sum(r['attempts'] for r in results):,}")
+        print(f"🔢 Total Attempts: {total_attempts:,}")
         print(f"📁 Results saved to: robust_batch_results.csv")
         
     except KeyboardInterrupt:
@@ -38,6 +38,7 @@ def main():
     order_number = config["order_details"]["order_number"]
     mobile_number = config["order_details"]["mobile_number"]
     headless = config["browser_settings"]["headless"]
+    debug = config.get("output_settings", {}).get("save_screenshots", False)
     
     print(f"Order Number: {order_number}")
     print(f"Mobile Number: {mobile_number}")
@@ -45,7 +46,7 @@ def main():
     print()
     
     # Initialize tracker
-    tracker = DuOrderTracker(headless=headless)
+    tracker = DuOrderTracker(headless=headless, debug=debug)
     
     try:
         print("Starting order tracking...")